@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -37,17 +38,20 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
-    'store'
+    'store.apps.StoreConfig'
 ]
 
 MIDDLEWARE = [
+    'store.middlewares.metrics.metrics_middleware',
     'django.middleware.security.SecurityMiddleware',
+    'store.middlewares.replica.replica_middleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'store.middlewares.cart.cart_middleware',
 
 ]
 
@@ -55,7 +59,8 @@ ROOT_URLCONF = 'Eshop.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # the Django backend, timing renders for the request metrics
+        'BACKEND': 'store.metrics.TimedTemplates',
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -64,6 +69,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'store.context_processors.cart',
             ],
         },
     },
@@ -75,14 +81,115 @@ WSGI_APPLICATION = 'Eshop.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.1/ref/settings/#databases
 
+# Every new SQLite connection gets the pragmas in store/sqlite.py (busy
+# timeout, mmap, cache size); override any of them with SQLITE_PRAGMAS.
+# QUICKCART_SQLITE_WAL=1 also switches the database to WAL, which suits a
+# deployed database; it rewrites the file's header and adds -wal/-shm files
+# next to it, so it stays off for the db.sqlite3 checked into the repo.
+# QUICKCART_CONN_MAX_AGE keeps connections open between requests, which
+# only helps under WSGI: under ASGI each request's database calls run on a
+# different thread, so kept connections are never reused and pile up. Leave
+# it at 0 there.
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': int(os.environ.get('QUICKCART_CONN_MAX_AGE', 0)),
+    }
+}
+
+SQLITE_PRAGMAS = {}
+SQLITE_WAL = bool(os.environ.get('QUICKCART_SQLITE_WAL'))
+
+# Read replicas: storefront reads are spread over DATABASE_REPLICAS and every
+# write goes to 'default'. A browser that wrote reads from the primary for
+# DATABASE_REPLICA_PIN_SECONDS afterwards. Locally, list SQLite files in
+# QUICKCART_READ_REPLICAS (separated by os.pathsep) and copy the primary onto
+# them with `manage.py sync_replicas`.
+
+DATABASE_REPLICAS = []
+for number, name in enumerate(filter(None, os.environ.get('QUICKCART_READ_REPLICAS', '').split(os.pathsep)), 1):
+    DATABASES[f'replica{number}'] = dict(DATABASES['default'], NAME=name, TEST={'MIRROR': 'default'})
+    DATABASE_REPLICAS.append(f'replica{number}')
+
+DATABASE_ROUTERS = ['store.routers.PrimaryReplicaRouter']
+DATABASE_REPLICA_PIN_SECONDS = 10
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.1/topics/cache/
+# The catalog version counter lives here, so every worker must share one
+# cache (memcached/redis) in production for invalidation to reach them all.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'quickcart',
     }
 }
 
 
+# Carts are kept out of the session table. SignedCookieCartStore keeps the
+# whole cart in the browser; CacheCartStore keeps one counter per cart line
+# in CACHES['default'] and needs that cache to be shared by all workers.
+
+CART_STORE = 'store.cart.SignedCookieCartStore'
+
+
+# Logging
+# https://docs.djangoproject.com/en/3.1/topics/logging/
+# The store's own messages go to the console at STORE_LOG_LEVEL (INFO by
+# default; DEBUG shows the per-request cart, order and auth details).
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'simple': {
+            'format': '{asctime} {levelname} {name}: {message}',
+            'style': '{',
+        },
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'simple',
+        },
+    },
+    'loggers': {
+        'store': {
+            'handlers': ['console'],
+            'level': os.environ.get('STORE_LOG_LEVEL', 'INFO'),
+        },
+    },
+}
+
+
+# Per-view request metrics are served in Prometheus format at /metrics to
+# requests sending "Authorization: Bearer <METRICS_TOKEN>" (and to logged-in
+# staff). Behind a reverse proxy every peer address is the proxy's, so the
+# address is not trusted; without a token only staff can read them.
+
+METRICS_TOKEN = os.environ.get('QUICKCART_METRICS_TOKEN', '')
+
+
+# Background jobs
+# Checkout and product saves queue follow-up work (sales rollups, the order
+# confirmation email, thumbnails) in the Job table; `manage.py run_workers`
+# runs it. JOBS_EAGER runs each job right after its transaction commits
+# instead, for development without a worker.
+
+JOBS_EAGER = False
+
+
+# Email
+# https://docs.djangoproject.com/en/3.1/topics/email/
+
+EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+DEFAULT_FROM_EMAIL = 'Quickcart <orders@quickcart.local>'
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.1/ref/settings/#auth-password-validators
 
@@ -102,6 +209,19 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Login and signup hash passwords on a small dedicated thread pool; requests
+# beyond MAX_PENDING queued hashes are turned away instead of piling up.
+
+PASSWORD_HASHING_WORKERS = 2
+PASSWORD_HASHING_MAX_PENDING = 32
+
+# Addresses of the reverse proxies in front of the site. Requests from them
+# are rate limited by the client address they add to X-Forwarded-For;
+# without this every client behind the proxy shares one limit.
+
+TRUSTED_PROXIES = list(filter(None, os.environ.get('QUICKCART_TRUSTED_PROXIES', '').split(',')))
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/3.1/topics/i18n/
 
@@ -120,5 +240,13 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/3.1/howto/static-files/
 
 STATIC_URL = '/static/'
+STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR /'media'
+
+# collectstatic writes .gz (and .br with brotli installed) beside text
+# assets for the web server to serve precompressed. Uploaded files get
+# content-hashed URLs that store.views.media serves with far-future caching,
+# validators and Range support.
+STATICFILES_STORAGE = 'store.storage.CompressedStaticFilesStorage'
+DEFAULT_FILE_STORAGE = 'store.storage.HashedMediaStorage'
@@ -1,9 +1,14 @@
 from django.contrib import admin
 from django.urls import path  , include
-from django.conf.urls.static import static
+from store.storage import HASHED_PREFIX
+from store.views.media import serve_media
 from . import settings
 
+media_prefix = settings.MEDIA_URL.lstrip('/')
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path(f'{media_prefix}{HASHED_PREFIX}/<str:digest>/<path:name>', serve_media, name='media-hashed'),
+    path(f'{media_prefix}<path:name>', serve_media, name='media'),
     path('' , include('store.urls'))
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+]
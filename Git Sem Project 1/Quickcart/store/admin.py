@@ -1,22 +1,117 @@
-from django.contrib import admin
+from django.contrib import admin, messages
+from django.utils import timezone
 from .models.product import Products
 from .models.category import Category
 from .models.customer import Customer
 from .models.orders import Order
+from .models.job import Job
+from .models.stock import StockMovement
+from .exports import stream_orders_csv
+from .pagination import EstimatedCountPaginator
+from .rollups import set_order_status
 
 
 class AdminProduct(admin.ModelAdmin):
-    list_display = ['name', 'price', 'category']
+    list_display = ['name', 'sku', 'price', 'category', 'stock', 'reorder_level', 'reorder_required']
+    list_select_related = ['category']
+    list_filter = ['reorder_required', 'category']
+    search_fields = ['name', '=sku']
+    readonly_fields = ['reorder_required']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def save_model(self, request, obj, form, change):
+        # an edited stock count becomes a ledger adjustment from the current
+        # balance instead of overwriting sales made since the form loaded
+        on_hand = obj.stock
+        if change:
+            fields = [field for field in form.changed_data if field != 'stock']
+            if fields:
+                obj.save(update_fields=fields)
+        else:
+            obj.stock = None
+            obj.save()
+        if not change or 'stock' in form.changed_data:
+            StockMovement.set_levels({obj.id: on_hand}, reference=f'admin:{request.user.get_username()}')
+        if 'reorder_level' in form.changed_data:
+            Products.refresh_reorder_flags(Products.objects.filter(id=obj.id))
+        obj.refresh_from_db(fields=['stock', 'reorder_required'])
 
 
 class CategoryAdmin(admin.ModelAdmin):
     list_display = ['name']
 
+
+class CustomerAdmin(admin.ModelAdmin):
+    list_display = ['email', 'first_name', 'last_name', 'phone']
+    # emails are stored lower-cased, so an exact search can use the index
+    search_fields = ['=email', 'last_name']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+class OrderAdmin(admin.ModelAdmin):
+    list_display = ['id', 'date', 'customer', 'product', 'quantity', 'price', 'status']
+    list_select_related = ['customer', 'product']
+    list_filter = ['status', 'date']
+    date_hierarchy = 'date'
+    raw_id_fields = ['customer', 'product']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = ['mark_completed', 'mark_pending', 'export_as_csv']
+
+    def mark_completed(self, request, queryset):
+        count = set_order_status(queryset, True)
+        self.message_user(request, f'Marked {count} orders as completed.', messages.SUCCESS)
+    mark_completed.short_description = 'Mark selected orders as completed'
+
+    def mark_pending(self, request, queryset):
+        count = set_order_status(queryset, False)
+        self.message_user(request, f'Marked {count} orders as pending.', messages.SUCCESS)
+    mark_pending.short_description = 'Mark selected orders as pending'
+
+    def export_as_csv(self, request, queryset):
+        return stream_orders_csv(queryset)
+    export_as_csv.short_description = 'Export selected orders as CSV'
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'name', 'status', 'attempts', 'run_at', 'locked_by', 'finished']
+    list_filter = ['status', 'name']
+    readonly_fields = ['created', 'locked_at', 'finished', 'last_error']
+    actions = ['retry']
+
+    def retry(self, request, queryset):
+        count = queryset.exclude(status=Job.RUNNING).update(status=Job.QUEUED, attempts=0, run_at=timezone.now())
+        self.message_user(request, f'Queued {count} jobs again.', messages.SUCCESS)
+    retry.short_description = 'Run selected jobs again'
+
+class StockMovementAdmin(admin.ModelAdmin):
+    # the ledger is append-only: lines are recorded by checkout, imports,
+    # product edits and `manage.py receive_stock`, never edited here
+    list_display = ['id', 'created', 'product', 'kind', 'quantity', 'reference']
+    list_select_related = ['product']
+    list_filter = ['kind']
+    search_fields = ['=product__sku', 'reference']
+    raw_id_fields = ['product']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
 # Register your models here.
 admin.site.register(Products,AdminProduct)
-admin.site.register(Category)
-admin.site.register(Customer)
-admin.site.register(Order)
+admin.site.register(Category, CategoryAdmin)
+admin.site.register(Customer, CustomerAdmin)
+admin.site.register(Order, OrderAdmin)
+admin.site.register(Job, JobAdmin)
+admin.site.register(StockMovement, StockMovementAdmin)
 
 
 # username = Tanushree, email = tanushree7252@gmail.com, password = 1234
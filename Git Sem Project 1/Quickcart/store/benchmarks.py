@@ -0,0 +1,154 @@
+import math
+import statistics
+import time
+import uuid
+from contextlib import ExitStack
+
+from django.core.cache import cache
+from django.db import connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from store.catalog import PRICE_BANDS
+from store.models.category import Category
+from store.models.customer import Customer
+from store.models.product import Products
+from store.synthetic import EMAIL_DOMAIN, PASSWORD, customer_email
+
+# Most SQL queries one request of each scenario may run. A change that adds
+# a query per product, cart line or order shows up here as a failure.
+QUERY_BUDGETS = {
+    'store': 4,
+    'store_category': 2,
+    'store_filtered': 2,
+    'cart': 3,
+    'checkout': 10,
+    'orders': 2,
+    'login': 4,
+}
+
+CART_LINES = 3
+
+
+def percentile(values, fraction):
+    # nearest-rank percentile of an already sorted list
+    index = max(0, math.ceil(fraction * len(values)) - 1)
+    return values[index]
+
+
+class Timing:
+    def __init__(self, budget):
+        self.budget = budget
+        self.latencies = []
+        self.queries = []
+        self.statuses = {}
+
+    def add(self, seconds, queries, status):
+        self.latencies.append(seconds * 1000)
+        self.queries.append(queries)
+        self.statuses[str(status)] = self.statuses.get(str(status), 0) + 1
+
+    @property
+    def over_budget(self):
+        return max(self.queries) > self.budget
+
+    def report(self):
+        latencies = sorted(self.latencies)
+        return {
+            'requests': len(latencies),
+            'statuses': self.statuses,
+            'queries': {'budget': self.budget, 'max': max(self.queries),
+                        'mean': round(statistics.mean(self.queries), 2)},
+            'latency_ms': {'p50': round(percentile(latencies, 0.50), 3),
+                           'p90': round(percentile(latencies, 0.90), 3),
+                           'p99': round(percentile(latencies, 0.99), 3),
+                           'max': round(latencies[-1], 3),
+                           'mean': round(statistics.mean(latencies), 3)},
+        }
+
+
+class Benchmark:
+    """Drives the storefront through the test client and times each request.
+
+    Each scenario has a ``prepare_<name>`` step that is not measured (for
+    example refilling the cart a checkout emptied) and a ``request_<name>``
+    step that is: its wall time and the SQL queries it ran on every database
+    alias are recorded.
+    """
+
+    scenarios = ['store', 'store_category', 'store_filtered', 'cart', 'checkout', 'orders', 'login']
+
+    def __init__(self, iterations=50, budgets=None):
+        self.iterations = iterations
+        self.budgets = dict(QUERY_BUDGETS, **(budgets or {}))
+        self.client = Client()
+        self.categories = list(Category.objects.order_by('id').values_list('id', flat=True))
+        # the best-stocked tracked products, so checkouts take the stock
+        # reservation path and do not run out
+        self.products = list(Products.objects.filter(stock__isnull=False).order_by('-stock', 'id')
+                             .values_list('id', flat=True)[:CART_LINES])
+        self.customers = Customer.objects.filter(email__endswith=f'@{EMAIL_DOMAIN}').count()
+
+    def run(self, scenarios=None):
+        cache.clear()
+        self.log_in(self.client, 0)
+        results = {}
+        for name in scenarios or self.scenarios:
+            timing = Timing(self.budgets[name])
+            for number in range(self.iterations):
+                prepare = getattr(self, f'prepare_{name}', None)
+                if prepare:
+                    prepare(number)
+                timing.add(*self.measure(getattr(self, f'request_{name}'), number))
+            results[name] = timing
+        return results
+
+    def measure(self, request, number):
+        with ExitStack() as stack:
+            contexts = [stack.enter_context(CaptureQueriesContext(connections[alias]))
+                        for alias in connections]
+            start = time.perf_counter()
+            response = request(number)
+            elapsed = time.perf_counter() - start
+        return elapsed, sum(len(context) for context in contexts), response.status_code
+
+    def log_in(self, client, number, **extra):
+        return client.post('/login', {'email': customer_email(number), 'password': PASSWORD}, **extra)
+
+    def fill_cart(self):
+        for product_id in self.products:
+            self.client.post('/', {'product': product_id})
+
+    def request_store(self, number):
+        return self.client.get('/store')
+
+    def request_store_category(self, number):
+        return self.client.get(f'/store?category={self.categories[number % len(self.categories)]}')
+
+    def request_store_filtered(self, number):
+        band = PRICE_BANDS[number % len(PRICE_BANDS)][0]
+        return self.client.get(f'/store?category={self.categories[number % len(self.categories)]}'
+                               f'&price={band}&sort=price')
+
+    def prepare_cart(self, number):
+        if number == 0:
+            self.fill_cart()
+
+    def request_cart(self, number):
+        return self.client.get('/cart')
+
+    def prepare_checkout(self, number):
+        self.fill_cart()
+
+    def request_checkout(self, number):
+        return self.client.post('/check-out', {'address': 'Benchmark Street 1', 'phone': '0000000000',
+                                               'checkout_token': uuid.uuid4().hex})
+
+    def request_orders(self, number):
+        return self.client.get('/orders')
+
+    def request_login(self, number):
+        # a fresh browser and address per attempt, so the login rate limits
+        # measure nothing but the happy path
+        return self.log_in(Client(), 1 + number % (self.customers - 1),
+                           REMOTE_ADDR=f'10.{number // 65536 % 256}.{number // 256 % 256}.{number % 256}')
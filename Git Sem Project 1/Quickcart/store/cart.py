@@ -0,0 +1,239 @@
+import json
+import uuid
+from collections import namedtuple
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.utils.module_loading import import_string
+
+CartLine = namedtuple('CartLine', ['product', 'quantity', 'total'])
+
+CART_COOKIE_AGE = 60 * 60 * 24 * 14
+
+
+class CartStore:
+    """Where a shopper's cart lives between requests.
+
+    ``items()`` returns ``{product id: quantity}`` and ``add()`` applies a
+    signed delta to one line, returning the line's new quantity. Stores write
+    through to their backend as they go; ``persist()`` is called with the
+    response so cookie-based stores can attach what they need.
+    """
+
+    def __init__(self, request):
+        self.request = request
+
+    def items(self):
+        raise NotImplementedError
+
+    def add(self, product_id, delta=1):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def persist(self, response):
+        pass
+
+    def changed(self):
+        # drop the request's CartView so it is rebuilt from the new state
+        self.request.__dict__.pop('_cart_view', None)
+
+
+class SignedCookieCartStore(CartStore):
+    """The whole cart in a signed cookie: no server-side state at all.
+
+    Each browser only ever writes its own cookie, so nothing is shared to
+    contend on; two tabs clicking at the same instant can still overwrite
+    each other, the same as any cookie.
+    """
+    cookie_name = 'cart'
+    salt = 'store.cart'
+
+    def __init__(self, request):
+        super().__init__(request)
+        self.dirty = False
+        try:
+            cart = json.loads(request.get_signed_cookie(self.cookie_name, '{}', salt=self.salt))
+            self.cart = {int(product_id): int(quantity) for product_id, quantity in cart.items()
+                         if int(quantity) > 0}
+        except (ValueError, TypeError, AttributeError):
+            self.cart = {}
+
+    def items(self):
+        return dict(self.cart)
+
+    def add(self, product_id, delta=1):
+        quantity = self.cart.get(product_id, 0) + delta
+        if quantity > 0:
+            self.cart[product_id] = quantity
+        else:
+            self.cart.pop(product_id, None)
+            quantity = 0
+        self.dirty = True
+        self.changed()
+        return quantity
+
+    def clear(self):
+        self.cart = {}
+        self.dirty = True
+        self.changed()
+
+    def persist(self, response):
+        if not self.dirty:
+            return
+        if self.cart:
+            response.set_signed_cookie(self.cookie_name, json.dumps(self.cart, separators=(',', ':')),
+                                       salt=self.salt, max_age=CART_COOKIE_AGE,
+                                       httponly=True, samesite='Lax')
+        else:
+            response.delete_cookie(self.cookie_name, samesite='Lax')
+
+
+class CacheCartStore(CartStore):
+    """One cache key per cart line, changed with atomic incr/decr.
+
+    Concurrent clicks on different tabs each move their own line counter
+    instead of rewriting a shared dict. A product entering the cart claims
+    the next slot of an atomic counter and writes its id there, so no key is
+    ever read, modified and written back; lines that have since dropped to
+    zero are skipped when reading. Needs a cache shared by every worker
+    (memcached, redis) in production.
+    """
+    cookie_name = 'cart_id'
+
+    def __init__(self, request):
+        super().__init__(request)
+        self.cart_id = request.COOKIES.get(self.cookie_name)
+        self.new_id = False
+        if not self.cart_id or len(self.cart_id) != 32 or not self.cart_id.isalnum():
+            self.cart_id = None
+
+    def _line_key(self, product_id):
+        return f'cart:{self.cart_id}:{product_id}'
+
+    def _slots_key(self):
+        return f'cart:{self.cart_id}:slots'
+
+    def _slot_key(self, slot):
+        return f'cart:{self.cart_id}:slot:{slot}'
+
+    def _product_ids(self):
+        slots = cache.get(self._slots_key(), 0)
+        found = cache.get_many([self._slot_key(slot) for slot in range(1, slots + 1)])
+        # a product that left and re-entered the cart holds two slots
+        return list(dict.fromkeys(found[self._slot_key(slot)] for slot in range(1, slots + 1)
+                                  if self._slot_key(slot) in found))
+
+    def _keys(self):
+        slots = cache.get(self._slots_key(), 0)
+        return [self._line_key(product_id) for product_id in self._product_ids()] + \
+            [self._slot_key(slot) for slot in range(1, slots + 1)] + [self._slots_key()]
+
+    def items(self):
+        if not self.cart_id:
+            return {}
+        product_ids = self._product_ids()
+        lines = cache.get_many([self._line_key(product_id) for product_id in product_ids])
+        return {product_id: lines[self._line_key(product_id)] for product_id in product_ids
+                if lines.get(self._line_key(product_id), 0) > 0}
+
+    def add(self, product_id, delta=1):
+        if not self.cart_id:
+            self.cart_id = uuid.uuid4().hex
+            self.new_id = True
+        key = self._line_key(product_id)
+        self.changed()
+        if delta > 0 and cache.add(key, delta, CART_COOKIE_AGE):
+            cache.add(self._slots_key(), 0, CART_COOKIE_AGE)
+            cache.set(self._slot_key(cache.incr(self._slots_key())), product_id, CART_COOKIE_AGE)
+            return delta
+        try:
+            quantity = cache.incr(key, delta)
+        except ValueError:
+            # the line expired or never existed
+            return 0
+        if quantity <= 0:
+            cache.delete(key)
+            return 0
+        return quantity
+
+    def clear(self):
+        if not self.cart_id:
+            return
+        cache.delete_many(self._keys())
+        self.changed()
+
+    def persist(self, response):
+        if self.new_id:
+            response.set_cookie(self.cookie_name, self.cart_id, max_age=CART_COOKIE_AGE,
+                                httponly=True, samesite='Lax')
+
+
+def get_cart_store(request):
+    store = getattr(request, '_cart_store', None)
+    if store is None:
+        backend = import_string(getattr(settings, 'CART_STORE', 'store.cart.SignedCookieCartStore'))
+        store = backend(request)
+        request._cart_store = store
+    return store
+
+
+class CartView:
+    """Read-only view over the shopper's cart, built once per request.
+
+    The cart store's ``{product id: quantity}`` is copied into an int-keyed
+    map a single time so templates and views do one dict lookup per product
+    instead of scanning and converting the whole cart.
+    """
+
+    def __init__(self, cart=None):
+        self.quantities = {}
+        for product_id, quantity in (cart or {}).items():
+            try:
+                self.quantities[int(product_id)] = quantity
+            except (TypeError, ValueError):
+                continue
+        self.lines = []
+        self.total = 0
+
+    @staticmethod
+    def for_request(request):
+        view = getattr(request, '_cart_view', None)
+        if view is None:
+            view = CartView(get_cart_store(request).items())
+            request._cart_view = view
+        return view
+
+    def __contains__(self, product_id):
+        return product_id in self.quantities
+
+    def __bool__(self):
+        return bool(self.quantities)
+
+    def __len__(self):
+        return len(self.quantities)
+
+    @property
+    def count(self):
+        return len(self.quantities)
+
+    def product_ids(self):
+        return list(self.quantities)
+
+    def quantity(self, product_id):
+        return self.quantities.get(product_id, 0)
+
+    def bind(self, products):
+        # compute the per-line and grand totals for the given products
+        self.lines = []
+        self.total = 0
+        for product in products:
+            quantity = self.quantities.get(product.id)
+            if not quantity:
+                continue
+            line = CartLine(product, quantity, product.price * quantity)
+            self.lines.append(line)
+            self.total += line.total
+        return self
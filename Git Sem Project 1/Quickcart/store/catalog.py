@@ -0,0 +1,176 @@
+import time
+from collections import namedtuple
+
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.http import urlencode
+
+from store import routers
+from store.models.product import Products
+from store.models.category import Category
+from store.pagination import KeysetPage, decode_cursor, encode_cursor
+
+CATALOG_VERSION_KEY = 'catalog:version'
+CATALOG_TIMEOUT = 60 * 60 * 24
+
+# A product card's cart-independent markup; the cart buttons are
+# rendered around it per request.
+ProductCard = namedtuple('ProductCard', ['id', 'price', 'html'])
+
+# (slug, label, lowest price, price the band stops below); None is open
+PRICE_BANDS = [
+    ('under-500', 'Under Rs 500', None, 500),
+    ('500-1000', 'Rs 500 to 1,000', 500, 1000),
+    ('1000-5000', 'Rs 1,000 to 5,000', 1000, 5000),
+    ('5000-20000', 'Rs 5,000 to 20,000', 5000, 20000),
+    ('over-20000', 'Rs 20,000 and above', 20000, None),
+]
+# keys of Products.ORDERINGS offered to shoppers, the default first
+SORTS = [
+    ('id', 'Default'),
+    ('price', 'Price: low to high'),
+    ('price_desc', 'Price: high to low'),
+    ('newest', 'Newest'),
+]
+
+# a shopper's current view of the catalog: category id or None, index into
+# PRICE_BANDS or None, and a key of SORTS
+Filters = namedtuple('Filters', ['category', 'band', 'sort'])
+
+
+def get_catalog_version():
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        # seeded from the clock so an evicted counter can never come back
+        # as a version that still has stale pages cached under it
+        cache.add(CATALOG_VERSION_KEY, int(time.time() * 1000), None)
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+
+def bump_catalog_version():
+    try:
+        return cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        return get_catalog_version()
+
+
+# Everything cached here is read from the primary (routers.primary): it is
+# stored under the current catalog version and served to every shopper.
+
+def _key(*parts):
+    return ':'.join(['catalog', str(get_catalog_version())] + [str(p) for p in parts])
+
+
+def _category_id(value):
+    try:
+        return int(value) if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+def get_filters(query):
+    # unknown or malformed values fall back to the unfiltered default
+    slugs = [band[0] for band in PRICE_BANDS]
+    price = query.get('price')
+    sort = query.get('sort')
+    return Filters(_category_id(query.get('category')),
+                   slugs.index(price) if price in slugs else None,
+                   sort if sort in dict(SORTS) else SORTS[0][0])
+
+
+def store_url(filters):
+    query = {}
+    if filters.category:
+        query['category'] = filters.category
+    if filters.band is not None:
+        query['price'] = PRICE_BANDS[filters.band][0]
+    if filters.sort != SORTS[0][0]:
+        query['sort'] = filters.sort
+    return reverse('store') + (f'?{urlencode(query)}' if query else '')
+
+
+def get_facet_counts():
+    # {(category id, price band): products} for the whole catalog. Any
+    # combination of filters is answered from it, so the one grouped query
+    # runs once per catalog version.
+    key = _key('facets')
+    counts = cache.get(key)
+    if counts is None:
+        with routers.primary():
+            counts = Products.count_by_category_and_price([band[3] for band in PRICE_BANDS[:-1]])
+        cache.set(key, counts, CATALOG_TIMEOUT)
+    return counts
+
+
+def _count(counts, category=None, band=None):
+    return sum(count for (category_id, band_index), count in counts.items()
+               if category in (None, category_id) and band in (None, band_index))
+
+
+def get_sidebar(filters=Filters(None, None, SORTS[0][0])):
+    # category counts are for the chosen price band and band counts for the
+    # chosen category, so every number is what its link will show
+    key = _key('sidebar', *filters)
+    html = cache.get(key)
+    if html is None:
+        counts = get_facet_counts()
+        categories = [{'name': category.name,
+                       'url': store_url(filters._replace(category=category.id)),
+                       'count': _count(counts, category.id, filters.band),
+                       'active': category.id == filters.category}
+                      for category in Category.get_all_categories()]
+        bands = [{'name': label,
+                  'url': store_url(filters._replace(band=index)),
+                  'count': _count(counts, filters.category, index),
+                  'active': index == filters.band}
+                 for index, (slug, label, low, high) in enumerate(PRICE_BANDS)]
+        sorts = [{'name': label,
+                  'url': store_url(filters._replace(sort=sort)),
+                  'active': sort == filters.sort}
+                 for sort, label in SORTS]
+        html = render_to_string('category_sidebar.html', {
+            'filters': filters,
+            'all_url': store_url(filters._replace(category=None)),
+            'all_count': _count(counts, None, filters.band),
+            'any_price_url': store_url(filters._replace(band=None)),
+            'any_price_count': _count(counts, filters.category),
+            'categories': categories,
+            'bands': bands,
+            'sorts': sorts,
+        })
+        cache.set(key, html, CATALOG_TIMEOUT)
+    return html
+
+
+def get_product_cards(category_id=None, after=None, sort='id', band=None):
+    # one keyset page of cards; the decoded cursor is part of the key, so
+    # deep pages are cached just like the first, and a malformed or tampered
+    # cursor is served (and cached) as the first page
+    category_id = _category_id(category_id)
+    values = decode_cursor(after, Products, Products.ORDERINGS.get(sort, Products.ORDERINGS['id']))
+    after = encode_cursor(values) if values is not None else None
+    key = _key('cards', category_id or 'all', sort, 'any' if band is None else band,
+               '-'.join(str(value) for value in values) if values is not None else 'first')
+    page = cache.get(key)
+    if page is None:
+        price_range = PRICE_BANDS[band][2:] if band is not None else None
+        with routers.primary():
+            products = Products.get_products_page(category_id, after, sort, price_range=price_range)
+        cards = [ProductCard(product.id, product.price,
+                             render_to_string('product_card.html', {'product': product}))
+                 for product in products]
+        page = KeysetPage(cards, products.next_cursor)
+        cache.set(key, page, CATALOG_TIMEOUT)
+    return page
+
+
+def warm_catalog():
+    get_sidebar()
+    get_product_cards()
+    category_ids = [category.id for category in Category.get_all_categories()]
+    for category_id in category_ids:
+        get_sidebar(Filters(category_id, None, SORTS[0][0]))
+        get_product_cards(category_id)
+    return len(category_ids)
@@ -0,0 +1,226 @@
+import csv
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+from store.models.product import Products
+from store.models.category import Category
+from store.models.stock import StockMovement
+from store.catalog import bump_catalog_version
+from store.jobs import enqueue_many
+from store.search import index_products
+from store.thumbnails import delete_thumbnails, generate_thumbnails
+
+FIELDS = ['sku', 'name', 'price', 'category', 'description', 'image', 'stock', 'reorder_level']
+# stock is not overwritten: a new count is recorded as a ledger adjustment
+UPDATE_FIELDS = ['name', 'price', 'category', 'description', 'image', 'reorder_level']
+UPLOAD_DIR = Products._meta.get_field('image').upload_to
+
+
+def detect_format(path, fmt=None):
+    if fmt:
+        return fmt
+    return 'jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv'
+
+
+def read_rows(stream, fmt):
+    # yields (line number, row dict) per input row without loading the file;
+    # a JSONL line that does not parse is yielded as its JSONDecodeError so
+    # the importer reports it with the other bad rows
+    if fmt == 'jsonl':
+        for number, line in enumerate(stream, start=1):
+            if line.strip():
+                try:
+                    yield number, json.loads(line)
+                except json.JSONDecodeError as error:
+                    yield number, error
+    else:
+        reader = csv.DictReader(stream)
+        for row in reader:
+            # the line the row ends on; quoted fields may span lines
+            yield reader.line_num, row
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _digest(handle):
+    hasher = hashlib.sha256()
+    for chunk in iter(lambda: handle.read(64 * 1024), b''):
+        hasher.update(chunk)
+    return hasher.digest()
+
+
+def attach_image(images_dir, filename):
+    # copy one image into media storage (unless an identical one is already
+    # there) and make its thumbnails; runs on the import's worker threads
+    source = os.path.join(images_dir, os.path.basename(filename))
+    if not os.path.isfile(source):
+        return None
+    target = f'{UPLOAD_DIR}{os.path.basename(filename)}'
+    with open(source, 'rb') as handle:
+        if default_storage.exists(target):
+            with default_storage.open(target, 'rb') as current:
+                unchanged = _digest(current) == _digest(handle)
+            if not unchanged:
+                # same name, new picture: the old variants must not survive it
+                default_storage.delete(target)
+                delete_thumbnails(target)
+            handle.seek(0)
+        else:
+            unchanged = False
+        if not unchanged:
+            target = default_storage.save(target, File(handle))
+    generate_thumbnails(target)
+    return target
+
+
+class CatalogImporter:
+    """Upserts products keyed by ``sku`` in chunked bulk statements.
+
+    Every chunk is one transaction: a lookup of the chunk's existing SKUs,
+    one bulk_create and one bulk_update, then a stock adjustment for each
+    product whose count changed. Model signals do not fire for bulk
+    statements, so the catalog version, the search index and the thumbnail
+    jobs for new images are taken care of here instead.
+    """
+
+    def __init__(self, images_dir=None, chunk_size=1000, workers=8):
+        self.images_dir = images_dir
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.categories = {category.name: category for category in Category.objects.all()}
+        self.created = 0
+        self.updated = 0
+        self.errors = []
+
+    def run(self, rows):
+        # ``rows`` are (line number, row) pairs, as from read_rows
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for chunk in _chunks(rows, self.chunk_size):
+                self.import_chunk(chunk, pool)
+        bump_catalog_version()
+        return self
+
+    def _clean(self, row, line):
+        # columns missing from the input leave the existing value alone
+        try:
+            if isinstance(row, ValueError):
+                raise row
+            if not isinstance(row, dict):
+                raise ValueError('expected an object with the product fields')
+            sku = (row.get('sku') or '').strip()
+            name = (row.get('name') or '').strip()
+            category = (row.get('category') or '').strip()
+            if not sku or not name or not category:
+                raise ValueError('sku, name and category are required')
+            cleaned = {'sku': sku, 'name': name[:60], 'category': category[:50]}
+            if 'price' in row:
+                cleaned['price'] = int(row['price'] or 0)
+            if 'description' in row:
+                cleaned['description'] = (row['description'] or '')[:250]
+            if row.get('image'):
+                cleaned['image'] = row['image'].strip()
+            if row.get('stock') not in (None, ''):
+                cleaned['stock'] = int(row['stock'])
+            if row.get('reorder_level') not in (None, ''):
+                cleaned['reorder_level'] = int(row['reorder_level'])
+            return cleaned
+        except (ValueError, TypeError, AttributeError) as error:
+            self.errors.append(f'row {line}: {error}')
+            return None
+
+    def _categories(self, names):
+        missing = [name for name in names if name not in self.categories]
+        if missing:
+            Category.objects.bulk_create([Category(name=name) for name in missing])
+            for category in Category.objects.filter(name__in=missing):
+                self.categories[category.name] = category
+
+    def import_chunk(self, chunk, pool):
+        rows = {}
+        for line, row in chunk:
+            row = self._clean(row, line)
+            if row:
+                rows[row['sku']] = row
+
+        images = {}
+        if self.images_dir:
+            filenames = sorted({row['image'] for row in rows.values() if 'image' in row})
+            images = dict(zip(filenames, pool.map(lambda filename: attach_image(self.images_dir, filename),
+                                                  filenames)))
+
+        with transaction.atomic():
+            self._categories({row['category'] for row in rows.values()})
+            existing = Products.objects.filter(sku__in=list(rows)).in_bulk(field_name='sku')
+            created, updated, new_images = [], [], set()
+            for sku, row in rows.items():
+                product = existing.get(sku) or Products(sku=sku)
+                previous_image = product.image.name
+                product.name = row['name']
+                product.category = self.categories[row['category']]
+                for field in ('price', 'description', 'reorder_level'):
+                    if field in row:
+                        setattr(product, field, row[field])
+                if images.get(row.get('image')):
+                    product.image = images[row['image']]
+                elif 'image' in row and not product.image:
+                    product.image = f'{UPLOAD_DIR}{os.path.basename(row["image"])}'
+                if product.image and product.image.name != previous_image:
+                    new_images.add(product.image.name)
+                (updated if product.pk else created).append(product)
+            Products.objects.bulk_create(created, batch_size=500)
+            Products.objects.bulk_update(updated, UPDATE_FIELDS, batch_size=500)
+            ids = dict(Products.objects.filter(sku__in=list(rows)).values_list('sku', 'id'))
+            StockMovement.set_levels({ids[sku]: row['stock'] for sku, row in rows.items() if 'stock' in row},
+                                     reference='import')
+            Products.refresh_reorder_flags(
+                Products.objects.filter(id__in=[ids[sku] for sku, row in rows.items() if 'reorder_level' in row]))
+            # bulk statements skip the post_save signal that queues these;
+            # images copied above already have theirs
+            enqueue_many([('generate_thumbnails', {'name': name})
+                          for name in sorted(new_images - set(images.values()))])
+
+        touched = Products.objects.filter(sku__in=list(rows)).select_related('category')
+        index_products(touched)
+        self.created += len(created)
+        self.updated += len(updated)
+
+
+def export_rows(queryset=None, chunk_size=2000):
+    queryset = queryset if queryset is not None else Products.objects.all()
+    for product in queryset.select_related('category').order_by('id').iterator(chunk_size=chunk_size):
+        yield {
+            'sku': product.sku or '',
+            'name': product.name,
+            'price': product.price,
+            'category': product.category.name,
+            'description': product.description or '',
+            'image': os.path.basename(product.image.name) if product.image else '',
+            'stock': '' if product.stock is None else product.stock,
+            'reorder_level': product.reorder_level,
+        }
+
+
+def write_rows(rows, stream, fmt):
+    if fmt == 'jsonl':
+        for row in rows:
+            stream.write(json.dumps(row, ensure_ascii=False))
+            stream.write('\n')
+    else:
+        writer = csv.DictWriter(stream, fieldnames=FIELDS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
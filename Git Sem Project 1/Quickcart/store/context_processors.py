@@ -0,0 +1,5 @@
+from store.cart import CartView
+
+
+def cart(request):
+    return {'cart': CartView.for_request(request)}
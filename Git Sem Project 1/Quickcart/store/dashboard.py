@@ -0,0 +1,53 @@
+import datetime
+
+from django.db.models import Sum, F
+
+from store.models.sales import DailySales, MonthlySales
+
+
+def months_back(day, months):
+    # first day of the calendar month ``months`` before ``day``'s month
+    index = day.year * 12 + day.month - 1 - months
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def get_dashboard_data(today=None, months=12, days=30):
+    # every figure is an aggregate over the rollup tables, never over Order
+    today = today or datetime.date.today()
+    month_from = months_back(today, months - 1)
+    day_from = today - datetime.timedelta(days=days - 1)
+
+    totals = MonthlySales.objects.aggregate(revenue=Sum('revenue'),
+                                            quantity=Sum('quantity'),
+                                            lines=Sum('lines'),
+                                            completed_revenue=Sum('completed_revenue'),
+                                            completed_lines=Sum('completed_lines'))
+    totals = {name: value or 0 for name, value in totals.items()}
+    totals['pending_lines'] = totals['lines'] - totals['completed_lines']
+
+    top_products = list(MonthlySales.objects.values('product_id', name=F('product__name'))
+                        .annotate(revenue=Sum('revenue'), quantity=Sum('quantity'))
+                        .order_by('-revenue')[:10])
+    by_category = list(MonthlySales.objects.values('category_id', name=F('category__name'))
+                       .annotate(revenue=Sum('revenue'))
+                       .order_by('-revenue'))
+    monthly_trend = list(MonthlySales.objects.filter(month__gte=month_from)
+                         .values('month').annotate(revenue=Sum('revenue'), quantity=Sum('quantity'))
+                         .order_by('month'))
+    daily_trend = list(DailySales.objects.filter(day__gte=day_from)
+                       .values('day').annotate(revenue=Sum('revenue'), quantity=Sum('quantity'))
+                       .order_by('day'))
+
+    for rows in (by_category, monthly_trend, daily_trend):
+        peak = max((row['revenue'] for row in rows), default=0) or 1
+        for row in rows:
+            row['share'] = round(100 * row['revenue'] / peak)
+
+    return {
+        'totals': totals,
+        'top_product': top_products[0] if top_products else None,
+        'top_products': top_products,
+        'by_category': by_category,
+        'monthly_trend': monthly_trend,
+        'daily_trend': daily_trend,
+    }
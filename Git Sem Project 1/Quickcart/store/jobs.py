@@ -0,0 +1,174 @@
+import datetime
+import logging
+import random
+import traceback
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.db import close_old_connections, connections, router, transaction
+from django.db.models import F, Q
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from store.models.job import Job
+from store.models.customer import Customer
+from store.models.orders import Order
+from store.catalog import bump_catalog_version
+from store.rollups import record_orders
+from store.thumbnails import write_thumbnails
+
+logger = logging.getLogger(__name__)
+
+BACKOFF_SECONDS = 10
+BACKOFF_MAX_SECONDS = 60 * 60
+# a job running longer than this is assumed to belong to a dead worker
+LOCK_TIMEOUT = datetime.timedelta(minutes=15)
+
+_handlers = {}
+
+
+def job(name):
+    """Register the decorated function as the handler for jobs called ``name``."""
+    def register(func):
+        _handlers[name] = func
+        return func
+    return register
+
+
+def enqueue(name, payload=None, delay=0, max_attempts=5):
+    enqueue_many([(name, payload)], delay, max_attempts)
+
+
+def enqueue_many(jobs, delay=0, max_attempts=5):
+    # Inserts ``[(name, payload), ...]`` in one statement. Called inside a
+    # transaction, the jobs commit or roll back with the work that made them.
+    if getattr(settings, 'JOBS_EAGER', False):
+        for name, payload in jobs:
+            transaction.on_commit(lambda name=name, payload=payload: _handlers[name](**(payload or {})))
+        return
+    run_at = timezone.now() + datetime.timedelta(seconds=delay)
+    Job.objects.bulk_create([Job.build(name, payload, run_at, max_attempts) for name, payload in jobs])
+
+
+def backoff(attempts):
+    # exponential with +-50% jitter, so failed jobs do not retry in lockstep
+    delay = min(BACKOFF_MAX_SECONDS, BACKOFF_SECONDS * 2 ** max(0, attempts - 1))
+    return datetime.timedelta(seconds=delay * random.uniform(0.5, 1.5))
+
+
+def claim_jobs(worker, limit=10):
+    """Mark up to ``limit`` due jobs as running for ``worker`` and return them."""
+    now = timezone.now()
+    claim = dict(status=Job.RUNNING, locked_by=worker, locked_at=now, attempts=F('attempts') + 1)
+    due = Job.objects.filter(status=Job.QUEUED, run_at__lte=now).order_by('run_at', 'id')
+    if connections[router.db_for_write(Job)].features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            ids = list(due.select_for_update(skip_locked=True).values_list('id', flat=True)[:limit])
+            Job.objects.filter(id__in=ids).update(**claim)
+    else:
+        # SQLite has no row locks but runs one writer at a time, so a
+        # conditional UPDATE per candidate hands each job to exactly one worker
+        ids = [job_id for job_id in due.values_list('id', flat=True)[:limit]
+               if Job.objects.filter(id=job_id, status=Job.QUEUED).update(**claim)]
+    return list(Job.objects.filter(id__in=ids).order_by('run_at', 'id'))
+
+
+def requeue_stale(timeout=LOCK_TIMEOUT):
+    # give the jobs of crashed workers back to the queue, or fail them when
+    # they have used up their attempts
+    stale = Job.objects.filter(status=Job.RUNNING, locked_at__lt=timezone.now() - timeout)
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.FAILED, finished=timezone.now(), last_error='Worker lost while running the job')
+    requeued = stale.filter(attempts__lt=F('max_attempts')).update(
+        status=Job.QUEUED, locked_by='', locked_at=None)
+    return requeued, failed
+
+
+class JobWithdrawn(Exception):
+    """The job stopped being this worker's while its handler ran."""
+
+
+def run_job(job_id):
+    """Run one claimed job; returns True when it succeeded."""
+    job = Job.objects.filter(id=job_id).first()
+    if job is None:
+        # withdrawn after it was claimed, see JobWithdrawn
+        return False
+    try:
+        handler = _handlers.get(job.name)
+        if handler is None:
+            raise LookupError(f'No handler registered for {job.name!r}')
+        # the handler's writes and the job's completion commit together, so
+        # a retried job never applies its effects twice
+        with transaction.atomic():
+            handler(**job.payload)
+            # deleted by rebuild_rollups or requeued as stale meanwhile: its
+            # effects are already accounted for elsewhere, so roll them back
+            if not Job.objects.filter(id=job.id, status=Job.RUNNING, locked_by=job.locked_by) \
+                    .update(status=Job.DONE, finished=timezone.now(), last_error=''):
+                raise JobWithdrawn()
+        return True
+    except JobWithdrawn:
+        logger.info('job %s was withdrawn while running; its changes were rolled back', job)
+        return False
+    except Exception:
+        error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            logger.error('job %s failed for good:\n%s', job, error)
+            Job.objects.filter(id=job.id).update(status=Job.FAILED, finished=timezone.now(), last_error=error)
+        else:
+            logger.warning('job %s failed, attempt %s of %s:\n%s', job, job.attempts, job.max_attempts, error)
+            Job.objects.filter(id=job.id).update(status=Job.QUEUED, locked_by='', locked_at=None,
+                                                 run_at=timezone.now() + backoff(job.attempts),
+                                                 last_error=error)
+        return False
+
+
+def run_pooled_job(job_id):
+    # run_job on a long-lived pool worker: like a request, each job starts
+    # and ends by dropping connections that broke or outlived CONN_MAX_AGE,
+    # so one dead connection cannot fail every later job on the thread
+    close_old_connections()
+    try:
+        return run_job(job_id)
+    finally:
+        close_old_connections()
+
+
+def purge_finished(older_than=datetime.timedelta(days=7)):
+    return Job.objects.filter(Q(status=Job.DONE) | Q(status=Job.FAILED),
+                              finished__lt=timezone.now() - older_than).delete()[0]
+
+
+# Handlers
+
+def sales_lines(orders):
+    return [{'product_id': order.product_id, 'price': order.price, 'quantity': order.quantity,
+             'date': str(order.date.date() if isinstance(order.date, datetime.datetime) else order.date),
+             'status': order.status}
+            for order in orders]
+
+
+@job('record_sales')
+def record_sales(lines):
+    record_orders([Order(product_id=line['product_id'], price=line['price'], quantity=line['quantity'],
+                         date=datetime.date.fromisoformat(line['date']), status=line['status'])
+                   for line in lines])
+
+
+@job('send_order_confirmation')
+def send_order_confirmation(customer_id, lines, total):
+    customer = Customer.objects.filter(id=customer_id).first()
+    if customer is None:
+        return
+    body = render_to_string('emails/order_confirmation.txt',
+                            {'customer': customer, 'lines': lines, 'total': total})
+    send_mail('Your Quickcart order', body, None, [customer.email])
+
+
+@job('generate_thumbnails')
+def make_thumbnails(name):
+    widths, written = write_thumbnails(name)
+    if written:
+        # cached product cards were rendered without the new srcset
+        bump_catalog_version()
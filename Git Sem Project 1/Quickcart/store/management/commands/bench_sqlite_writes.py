@@ -0,0 +1,102 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+
+from store.sqlite import apply_pragmas, get_pragmas
+
+SCHEMA = '''
+CREATE TABLE product (id INTEGER PRIMARY KEY, stock INTEGER NOT NULL);
+CREATE TABLE order_line (id INTEGER PRIMARY KEY, product_id INTEGER NOT NULL,
+                         customer_id INTEGER NOT NULL, quantity INTEGER NOT NULL,
+                         price INTEGER NOT NULL, address TEXT, date TEXT);
+'''
+
+
+class Command(BaseCommand):
+    help = ('Measure concurrent checkout-style write throughput on a scratch SQLite '
+            'database with the default connection settings and with the tuned pragmas')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--transactions', type=int, default=200,
+                            help='Transactions per thread')
+        parser.add_argument('--lines', type=int, default=5, help='Order lines per transaction')
+
+    def handle(self, *args, **options):
+        profiles = [
+            ('default', {}, 5.0),
+            ('tuned', get_pragmas(wal=True), 0),
+        ]
+        for name, pragmas, timeout in profiles:
+            result = self.run_profile(pragmas, timeout, options)
+            self.stdout.write(
+                f"{name:8} {result['committed']:6} tx committed  {result['failed']:5} failed  "
+                f"{result['rate']:9.1f} tx/s  {result['elapsed']:6.2f}s")
+
+    def run_profile(self, pragmas, timeout, options):
+        directory = tempfile.mkdtemp(prefix='quickcart-bench-')
+        path = os.path.join(directory, 'bench.sqlite3')
+        try:
+            setup = sqlite3.connect(path)
+            apply_pragmas(setup.cursor(), pragmas)
+            setup.executescript(SCHEMA)
+            setup.executemany('INSERT INTO product (id, stock) VALUES (?, ?)',
+                              [(product_id, 10 ** 9) for product_id in range(1, 101)])
+            setup.commit()
+            setup.close()
+
+            counts = {'committed': 0, 'failed': 0}
+            lock = threading.Lock()
+            start = threading.Barrier(options['threads'] + 1)
+
+            def worker(seed):
+                # isolation_level=None: transactions are opened explicitly,
+                # the way Django's atomic() does it
+                connection = sqlite3.connect(path, timeout=timeout, isolation_level=None,
+                                             check_same_thread=False)
+                cursor = connection.cursor()
+                try:
+                    apply_pragmas(cursor, pragmas)
+                except sqlite3.OperationalError:
+                    start.abort()
+                    raise
+                start.wait()
+                committed = failed = 0
+                for number in range(options['transactions']):
+                    try:
+                        cursor.execute('BEGIN')
+                        for line in range(options['lines']):
+                            product_id = (seed * 31 + number * 7 + line) % 100 + 1
+                            cursor.execute('UPDATE product SET stock = stock - 1 '
+                                           'WHERE id = ? AND stock >= 1', (product_id,))
+                            cursor.execute('INSERT INTO order_line (product_id, customer_id, quantity, '
+                                           'price, address, date) VALUES (?, ?, 1, 100, ?, ?)',
+                                           (product_id, seed, 'bench', '2024-01-01'))
+                        cursor.execute('COMMIT')
+                        committed += 1
+                    except sqlite3.OperationalError:
+                        if connection.in_transaction:
+                            cursor.execute('ROLLBACK')
+                        failed += 1
+                connection.close()
+                with lock:
+                    counts['committed'] += committed
+                    counts['failed'] += failed
+
+            threads = [threading.Thread(target=worker, args=(seed,))
+                       for seed in range(options['threads'])]
+            for thread in threads:
+                thread.start()
+            start.wait()
+            began = time.perf_counter()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - began
+            return dict(counts, elapsed=elapsed, rate=counts['committed'] / elapsed if elapsed else 0)
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
@@ -0,0 +1,58 @@
+import json
+import platform
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, \
+    teardown_test_environment
+
+from store.benchmarks import Benchmark
+from store.synthetic import SCALES, SyntheticData
+
+
+class Command(BaseCommand):
+    help = ('Time the storefront views through the test client on a seeded throwaway database, '
+            'write a JSON report and fail when a view runs more queries than its budget')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=sorted(SCALES), default='1k')
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--iterations', type=int, default=50, help='Requests per scenario')
+        parser.add_argument('--scenario', action='append', choices=Benchmark.scenarios,
+                            help='Run only this scenario (repeatable)')
+        parser.add_argument('--report', default='benchmark-report.json',
+                            help="Where to write the JSON report, or '-' for stdout")
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        databases = setup_databases(verbosity=0, interactive=False)
+        try:
+            SyntheticData(options['scale'], options['seed']).run()
+            results = Benchmark(options['iterations']).run(options['scenario'])
+        finally:
+            teardown_databases(databases, verbosity=0)
+            teardown_test_environment()
+
+        report = {
+            'scale': options['scale'],
+            'seed': options['seed'],
+            'iterations': options['iterations'],
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'scenarios': {name: timing.report() for name, timing in results.items()},
+        }
+        text = json.dumps(report, indent=2, sort_keys=True)
+        if options['report'] == '-':
+            self.stdout.write(text)
+        else:
+            with open(options['report'], 'w') as handle:
+                handle.write(text + '\n')
+
+        for name, timing in results.items():
+            summary = timing.report()
+            self.stderr.write(f"{name:15} p50 {summary['latency_ms']['p50']:8.2f} ms  "
+                              f"p99 {summary['latency_ms']['p99']:8.2f} ms  "
+                              f"queries {summary['queries']['max']:3}/{timing.budget}")
+        over = [name for name, timing in results.items() if timing.over_budget]
+        if over:
+            raise CommandError(f"Over the query budget: {', '.join(over)}")
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from store.recommendations import TOP_K, rebuild_recommendations, refresh_recommendations
+
+
+class Command(BaseCommand):
+    help = ('Update the "frequently bought together" table from orders placed since the last run, '
+            'or recount every order with --full')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help='Recount every basket from scratch')
+        parser.add_argument('--top-k', type=int, default=TOP_K, help='Neighbours kept per product')
+
+    def handle(self, *args, **options):
+        if options['full']:
+            pairs = rebuild_recommendations(options['top_k'])
+            self.stdout.write(self.style.SUCCESS(f'Counted {pairs} co-purchase pairs'))
+        else:
+            products = refresh_recommendations(options['top_k'])
+            self.stdout.write(self.style.SUCCESS(f'Re-ranked {products} products'))
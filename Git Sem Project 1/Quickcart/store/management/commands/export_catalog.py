@@ -0,0 +1,25 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from store.catalog_io import detect_format, export_rows, write_rows
+
+
+class Command(BaseCommand):
+    help = 'Stream every product to a CSV or JSONL file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default='-', help="Output file (default: stdout)")
+        parser.add_argument('--format', choices=['csv', 'jsonl'],
+                            help='Output format (default: from the file extension)')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = detect_format(path, options['format'])
+        stream = sys.stdout if path == '-' else open(path, 'w', newline='', encoding='utf-8')
+        try:
+            write_rows(export_rows(chunk_size=options['chunk_size']), stream, fmt)
+        finally:
+            if stream is not sys.stdout:
+                stream.close()
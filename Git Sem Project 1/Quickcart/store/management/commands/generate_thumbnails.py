@@ -0,0 +1,38 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.core.files.storage import default_storage
+from django.db import connections
+
+from store.catalog import bump_catalog_version
+from store.models.product import Products
+from store.thumbnails import remember_thumbnail_widths, write_thumbnails
+
+
+class Command(BaseCommand):
+    help = 'Generate missing thumbnail variants for every product image'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Number of worker processes (default: one per core)')
+
+    def handle(self, *args, **options):
+        names = sorted(set(Products.objects.exclude(image='').values_list('image', flat=True)))
+        # forked workers must not share the parent's database connection
+        connections.close_all()
+        done = written = 0
+        with ProcessPoolExecutor(max_workers=max(1, options['workers'])) as pool:
+            for name, (widths, files) in zip(names, pool.map(write_thumbnails, names, chunksize=8)):
+                written += files
+                # the workers' caches die with them; record the result here
+                remember_thumbnail_widths(name, widths)
+                # images narrower than every width rightly get no variants
+                if widths or default_storage.exists(name):
+                    done += 1
+                else:
+                    self.stderr.write(f'Missing image: {name}')
+        if written:
+            # cached product cards carry the srcsets; one bump for the whole run
+            bump_catalog_version()
+        self.stdout.write(self.style.SUCCESS(f'Thumbnails ready for {done} of {len(names)} images'))
@@ -0,0 +1,35 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from store.catalog_io import CatalogImporter, detect_format, read_rows
+
+
+class Command(BaseCommand):
+    help = 'Upsert categories and products from a CSV or JSONL file, keyed by sku'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Input file, or '-' for stdin")
+        parser.add_argument('--format', choices=['csv', 'jsonl'],
+                            help='Input format (default: from the file extension)')
+        parser.add_argument('--images', help='Directory holding the image files named in the input')
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--workers', type=int, default=8,
+                            help='Threads copying images and making thumbnails')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = detect_format(path, options['format'])
+        stream = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8')
+        try:
+            importer = CatalogImporter(images_dir=options['images'],
+                                       chunk_size=options['chunk_size'],
+                                       workers=options['workers'])
+            importer.run(read_rows(stream, fmt))
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        for error in importer.errors:
+            self.stderr.write(error)
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {importer.created}, updated {importer.updated}, skipped {len(importer.errors)}'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from store.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = 'Recompute the daily and monthly sales rollups from every order'
+
+    def handle(self, *args, **options):
+        daily, monthly = rebuild_rollups()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {daily} daily and {monthly} monthly rollup rows'))
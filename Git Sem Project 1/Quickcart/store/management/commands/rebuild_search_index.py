@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from store.search import rebuild_search_index, get_search_backend
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the product search index from the products table'
+
+    def handle(self, *args, **options):
+        rebuild_search_index()
+        backend = type(get_search_backend()).__name__
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt search index ({backend})'))
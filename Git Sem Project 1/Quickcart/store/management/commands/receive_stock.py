@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from store.models.product import Products
+from store.models.stock import StockMovement
+
+
+class Command(BaseCommand):
+    help = 'Record a purchase receipt in the stock ledger'
+
+    def add_arguments(self, parser):
+        parser.add_argument('sku')
+        parser.add_argument('quantity', type=int)
+        parser.add_argument('--reference', default='', help='Purchase order or delivery note number')
+
+    def handle(self, *args, **options):
+        if options['quantity'] <= 0:
+            raise CommandError('Quantity must be positive')
+        product = Products.objects.filter(sku=options['sku']).first()
+        if product is None:
+            raise CommandError(f'No product with SKU {options["sku"]}')
+        with transaction.atomic():
+            if StockMovement.receive({product.id: options['quantity']}, options['reference']):
+                raise CommandError(f'{product.name} does not track stock')
+        product.refresh_from_db(fields=['stock'])
+        self.stdout.write(self.style.SUCCESS(f'Received {options["quantity"]} of {product.name}, '
+                                             f'{product.stock} on hand'))
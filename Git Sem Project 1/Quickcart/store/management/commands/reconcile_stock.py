@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from store.models.product import Products, reorder_required
+from store.models.stock import StockMovement
+
+
+class Command(BaseCommand):
+    help = 'Check every tracked product\'s stock and reorder flag against the stock ledger'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true',
+                            help='Reset mismatched balances to the ledger and recompute the flags')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            ledger = StockMovement.balances()
+            mismatched, flags = [], []
+            for product_id, stock, level, flagged in Products.objects.filter(stock__isnull=False) \
+                    .order_by('id').values_list('id', 'stock', 'reorder_level', 'reorder_required').iterator():
+                balance = ledger.get(product_id, 0)
+                if stock != balance:
+                    mismatched.append(product_id)
+                    self.stdout.write(f'product #{product_id}: stock {stock}, ledger {balance}')
+                elif flagged != (stock < level):
+                    flags.append(product_id)
+            flags += Products.objects.filter(stock__isnull=True, reorder_required=True).values_list('id', flat=True)
+
+            if options['fix']:
+                for product_id in mismatched:
+                    balance = max(0, ledger.get(product_id, 0))
+                    Products.objects.filter(id=product_id) \
+                        .update(stock=balance, reorder_required=reorder_required(balance))
+                Products.refresh_reorder_flags(Products.objects.filter(id__in=flags))
+
+        summary = f'{len(mismatched)} balances and {len(flags)} reorder flags disagree with the ledger'
+        if options['fix']:
+            self.stdout.write(self.style.SUCCESS(f'Fixed: {summary}'))
+        elif mismatched or flags:
+            raise CommandError(summary)
+        else:
+            self.stdout.write(self.style.SUCCESS('Stock balances match the ledger'))
@@ -0,0 +1,67 @@
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from store.jobs import claim_jobs, requeue_stale, run_pooled_job
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs (sales rollups, confirmation emails, thumbnails) until stopped'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--pool', choices=['thread', 'process'], default='thread',
+                            help='Run jobs on threads, or on processes for CPU-heavy work')
+        parser.add_argument('--poll', type=float, default=1.0, help='Seconds between polls of an empty queue')
+        parser.add_argument('--once', action='store_true', help='Exit once no job is due')
+
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+        worker_id = f'{socket.gethostname()}:{os.getpid()}'
+        stop = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stop.set())
+
+        if options['pool'] == 'process':
+            # fresh interpreters rather than forks, so no child inherits the
+            # parent's open database connection
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                       initializer=django.setup)
+        else:
+            pool = ThreadPoolExecutor(max_workers=workers)
+
+        running = set()
+        succeeded = failed = 0
+        with pool:
+            while not stop.is_set():
+                close_old_connections()
+                requeue_stale()
+                # claim only what the pool can start soon; the rest stays
+                # available to other workers
+                capacity = 2 * workers - len(running)
+                if capacity > 0:
+                    running |= {pool.submit(run_pooled_job, job.id) for job in claim_jobs(worker_id, capacity)}
+                if not running:
+                    if options['once']:
+                        break
+                    stop.wait(options['poll'])
+                    continue
+                done, running = wait(running, timeout=options['poll'], return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.result():
+                        succeeded += 1
+                    else:
+                        failed += 1
+            for future in running:
+                if future.result():
+                    succeeded += 1
+                else:
+                    failed += 1
+        self.stdout.write(self.style.SUCCESS(f'Ran {succeeded} jobs, {failed} failed'))
@@ -0,0 +1,24 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from store.synthetic import SCALES, SyntheticData
+
+
+class Command(BaseCommand):
+    help = 'Bulk-generate a deterministic synthetic catalog, customers and orders for load testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=sorted(SCALES), default='1k',
+                            help='Number of products; customers and orders scale with it')
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--end-date', type=datetime.date.fromisoformat,
+                            help='Date of the newest orders, YYYY-MM-DD (default: today)')
+
+    def handle(self, *args, **options):
+        if SyntheticData.exists():
+            raise CommandError('This database already holds synthetic data; seed a fresh database')
+        counts = SyntheticData(options['scale'], options['seed'], options['end_date']).run()
+        self.stdout.write(self.style.SUCCESS(
+            'Seeded {categories} categories, {products} products, {customers} customers '
+            'and {orders} orders'.format(**counts)))
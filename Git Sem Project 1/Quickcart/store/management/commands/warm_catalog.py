@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from store.catalog import warm_catalog
+
+
+class Command(BaseCommand):
+    help = 'Render and cache the category sidebar and every category product grid'
+
+    def handle(self, *args, **options):
+        count = warm_catalog()
+        self.stdout.write(self.style.SUCCESS(f'Warmed catalog pages for {count} categories'))
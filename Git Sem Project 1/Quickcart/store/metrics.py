@@ -0,0 +1,158 @@
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+
+from django.db.backends.signals import connection_created
+from django.template.backends.django import DjangoTemplates
+
+# upper bounds, in seconds, of the request latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# per-request tallies, installed by metrics_middleware
+_current = ContextVar('store_request_metrics', default=None)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.template_seconds = 0.0
+        self.template_depth = 0
+
+
+class Registry:
+    """In-process counters for every view, keyed by URL name.
+
+    One registry per worker process: Prometheus scrapes each process, or
+    sums them, as it does for any multi-process exporter.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.requests = {}
+        self.latency = {}
+        self.sql = {}
+        self.templates = {}
+
+    def observe(self, view, method, status, seconds, metrics):
+        with self.lock:
+            key = (view, method, str(status))
+            self.requests[key] = self.requests.get(key, 0) + 1
+            histogram = self.latency.get((view, method))
+            if histogram is None:
+                # [count per bucket..., +Inf count, sum]
+                histogram = self.latency[(view, method)] = [0] * (len(self.buckets) + 1) + [0.0]
+            histogram[bisect.bisect_left(self.buckets, seconds)] += 1
+            histogram[-1] += seconds
+            queries, sql_seconds = self.sql.get(view, (0, 0.0))
+            self.sql[view] = (queries + metrics.queries, sql_seconds + metrics.sql_seconds)
+            self.templates[view] = self.templates.get(view, 0.0) + metrics.template_seconds
+
+    def render(self):
+        # Prometheus text exposition format 0.0.4
+        with self.lock:
+            requests = dict(self.requests)
+            latency = {key: list(value) for key, value in self.latency.items()}
+            sql = dict(self.sql)
+            templates = dict(self.templates)
+
+        lines = ['# HELP quickcart_requests_total Requests handled, by view, method and status.',
+                 '# TYPE quickcart_requests_total counter']
+        for (view, method, status), count in sorted(requests.items()):
+            lines.append(f'quickcart_requests_total{{view="{view}",method="{method}",status="{status}"}} {count}')
+
+        lines += ['# HELP quickcart_request_duration_seconds Time from the first middleware to the response.',
+                  '# TYPE quickcart_request_duration_seconds histogram']
+        for (view, method), histogram in sorted(latency.items()):
+            labels = f'view="{view}",method="{method}"'
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), histogram):
+                cumulative += count
+                lines.append(f'quickcart_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'quickcart_request_duration_seconds_count{{{labels}}} {cumulative}')
+            lines.append(f'quickcart_request_duration_seconds_sum{{{labels}}} {histogram[-1]:.6f}')
+
+        lines += ['# HELP quickcart_sql_queries_total SQL queries run while handling requests.',
+                  '# TYPE quickcart_sql_queries_total counter']
+        lines += [f'quickcart_sql_queries_total{{view="{view}"}} {queries}'
+                  for view, (queries, _) in sorted(sql.items())]
+        lines += ['# HELP quickcart_sql_seconds_total Time spent in SQL queries.',
+                  '# TYPE quickcart_sql_seconds_total counter']
+        lines += [f'quickcart_sql_seconds_total{{view="{view}"}} {seconds:.6f}'
+                  for view, (_, seconds) in sorted(sql.items())]
+        lines += ['# HELP quickcart_template_seconds_total Time spent rendering templates.',
+                  '# TYPE quickcart_template_seconds_total counter']
+        lines += [f'quickcart_template_seconds_total{{view="{view}"}} {seconds:.6f}'
+                  for view, seconds in sorted(templates.items())]
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+def begin_request():
+    return _current.set(RequestMetrics())
+
+
+def end_request(token):
+    metrics = _current.get()
+    _current.reset(token)
+    return metrics
+
+
+def sql_wrapper(execute, sql, params, many, context):
+    # on every connection, so queries count whichever thread runs them; the
+    # request's tallies follow it into sync_to_async threads with its context
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.sql_seconds += time.perf_counter() - start
+
+
+def add_sql_wrapper(sender, connection, **kwargs):
+    if sql_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(sql_wrapper)
+
+
+class TimedTemplate:
+    """A backend template whose render() adds to the request's template time."""
+
+    def __init__(self, template):
+        self.template = template
+        self.origin = template.origin
+
+    def render(self, context=None, request=None):
+        metrics = _current.get()
+        if metrics is None:
+            return self.template.render(context, request)
+        # only the outermost render is timed; nested render_to_string calls
+        # are part of it
+        metrics.template_depth += 1
+        start = time.perf_counter()
+        try:
+            return self.template.render(context, request)
+        finally:
+            metrics.template_depth -= 1
+            if not metrics.template_depth:
+                metrics.template_seconds += time.perf_counter() - start
+
+
+class TimedTemplates(DjangoTemplates):
+    """The Django template backend, timing every template it hands out."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name))
+
+
+def install():
+    connection_created.connect(add_sql_wrapper, dispatch_uid='store.metrics.add_sql_wrapper')
@@ -1,12 +1,15 @@
+import logging
+
 from django.shortcuts import redirect
 
+logger = logging.getLogger(__name__)
+
 def auth_middleware(get_response):
     # One-time configuration and initialization.
 
     def middleware(request):
-        print(request.session.get('customer'))
         returnUrl = request.META['PATH_INFO']
-        print(request.META['PATH_INFO'])
+        logger.debug('customer %s requested %s', request.session.get('customer'), returnUrl)
         if not request.session.get('customer'):
            return redirect(f'login?return_url={returnUrl}')
 
@@ -0,0 +1,27 @@
+import asyncio
+
+from django.utils.decorators import sync_and_async_middleware
+
+
+def _persist(request, response):
+    store = getattr(request, '_cart_store', None)
+    if store is not None:
+        store.persist(response)
+
+
+@sync_and_async_middleware
+def cart_middleware(get_response):
+    # lets the request's cart store (if one was used) write its cookie
+
+    if asyncio.iscoroutinefunction(get_response):
+        async def middleware(request):
+            response = await get_response(request)
+            _persist(request, response)
+            return response
+    else:
+        def middleware(request):
+            response = get_response(request)
+            _persist(request, response)
+            return response
+
+    return middleware
@@ -0,0 +1,42 @@
+import asyncio
+import time
+
+from django.utils.decorators import sync_and_async_middleware
+
+from store import metrics
+
+
+def _observe(request, response, start, tallies):
+    match = request.resolver_match
+    view = (match.url_name or match.view_name) if match else 'unmatched'
+    metrics.registry.observe(view, request.method, response.status_code,
+                             time.perf_counter() - start, tallies)
+
+
+@sync_and_async_middleware
+def metrics_middleware(get_response):
+    # times every request and tallies its SQL and template work under the
+    # URL name of the view that handled it
+
+    if asyncio.iscoroutinefunction(get_response):
+        async def middleware(request):
+            token = metrics.begin_request()
+            start = time.perf_counter()
+            try:
+                response = await get_response(request)
+            finally:
+                tallies = metrics.end_request(token)
+            _observe(request, response, start, tallies)
+            return response
+    else:
+        def middleware(request):
+            token = metrics.begin_request()
+            start = time.perf_counter()
+            try:
+                response = get_response(request)
+            finally:
+                tallies = metrics.end_request(token)
+            _observe(request, response, start, tallies)
+            return response
+
+    return middleware
@@ -0,0 +1,47 @@
+import asyncio
+
+from django.conf import settings
+from django.utils.decorators import sync_and_async_middleware
+
+from store import routers
+
+
+def _begin(request):
+    window = settings.DATABASE_REPLICA_PIN_SECONDS
+    pinned = request.get_signed_cookie(routers.PIN_COOKIE, default=None,
+                                       salt=routers.PIN_SALT, max_age=window) is not None
+    return routers.begin_request(pinned)
+
+
+def _pin(response, state):
+    if state.wrote and routers.replica_aliases():
+        response.set_signed_cookie(routers.PIN_COOKIE, '1', salt=routers.PIN_SALT,
+                                   max_age=settings.DATABASE_REPLICA_PIN_SECONDS,
+                                   httponly=True, samesite='Lax')
+
+
+@sync_and_async_middleware
+def replica_middleware(get_response):
+    # keeps a browser's reads on the primary for a short window after it
+    # writes, so shoppers see their own order before the replicas catch up
+
+    if asyncio.iscoroutinefunction(get_response):
+        async def middleware(request):
+            token = _begin(request)
+            try:
+                response = await get_response(request)
+            finally:
+                state = routers.end_request(token)
+            _pin(response, state)
+            return response
+    else:
+        def middleware(request):
+            token = _begin(request)
+            try:
+                response = get_response(request)
+            finally:
+                state = routers.end_request(token)
+            _pin(response, state)
+            return response
+
+    return middleware
@@ -0,0 +1,24 @@
+# Generated by Django 3.1.7 on 2026-10-18 02:12
+
+import datetime
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0006_order_status'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CheckoutToken',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=32, unique=True)),
+                ('date', models.DateField(default=datetime.datetime.today)),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='store.customer')),
+            ],
+        ),
+    ]
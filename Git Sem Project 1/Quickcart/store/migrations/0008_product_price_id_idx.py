@@ -0,0 +1,17 @@
+# Generated by Django 3.1.7 on 2026-10-18 02:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0007_checkouttoken'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='products',
+            index=models.Index(fields=['price', 'id'], name='store_product_price_id_idx'),
+        ),
+    ]
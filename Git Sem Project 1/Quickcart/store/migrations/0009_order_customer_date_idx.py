@@ -0,0 +1,17 @@
+# Generated by Django 3.1.7 on 2026-10-18 02:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0008_product_price_id_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['customer', '-date', '-id'], name='store_order_customer_date_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+from django.db import migrations, OperationalError
+
+
+def create_fts_table(apps, schema_editor):
+    # FTS5 is SQLite-only; other backends fall back to the in-process index
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    try:
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS store_products_fts USING fts5("
+            "name, description, category, category_id UNINDEXED, "
+            "tokenize='unicode61 remove_diacritics 2', prefix='2 3')")
+    except OperationalError:
+        return
+    schema_editor.execute(
+        "INSERT INTO store_products_fts (rowid, name, description, category, category_id) "
+        "SELECT p.id, p.name, COALESCE(p.description, ''), c.name, p.category_id "
+        "FROM store_products p JOIN store_category c ON c.id = p.category_id")
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS store_products_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0009_order_customer_date_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 3.1.7 on 2026-10-18 02:17
+
+from django.db import migrations, models
+
+
+def normalize_emails(apps, schema_editor):
+    # Lower-case every address. Accounts that only differ by case (or are
+    # exact duplicates) are merged into the oldest one: their orders and
+    # checkout tokens move over and the duplicate rows are deleted, so the
+    # unique index builds and every remaining address can log in.
+    Customer = apps.get_model('store', 'Customer')
+    related = [(relation.related_model, relation.field.name)
+               for relation in Customer._meta.related_objects]
+    kept = {}
+    for customer_id, email in Customer.objects.order_by('id').values_list('id', 'email'):
+        normalized = (email or '').strip().lower()
+        if normalized not in kept:
+            kept[normalized] = customer_id
+            if normalized != email:
+                Customer.objects.filter(id=customer_id).update(email=normalized)
+            continue
+        for model, field in related:
+            model.objects.filter(**{field: customer_id}).update(**{field: kept[normalized]})
+        Customer.objects.filter(id=customer_id).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0010_products_fts'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_emails, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='customer',
+            name='email',
+            field=models.EmailField(max_length=254, unique=True),
+        ),
+    ]
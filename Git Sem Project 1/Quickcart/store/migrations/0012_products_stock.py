@@ -0,0 +1,18 @@
+# Generated by Django 3.1.7 on 2026-10-18 02:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0011_customer_email_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='products',
+            name='stock',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
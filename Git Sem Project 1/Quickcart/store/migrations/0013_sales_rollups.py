@@ -0,0 +1,58 @@
+# Generated by Django 3.1.7 on 2026-10-18 02:20
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0012_products_stock'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlySales',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.IntegerField(default=0)),
+                ('revenue', models.IntegerField(default=0)),
+                ('lines', models.IntegerField(default=0)),
+                ('completed_revenue', models.IntegerField(default=0)),
+                ('completed_lines', models.IntegerField(default=0)),
+                ('month', models.DateField()),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='store.category')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='store.products')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailySales',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.IntegerField(default=0)),
+                ('revenue', models.IntegerField(default=0)),
+                ('lines', models.IntegerField(default=0)),
+                ('completed_revenue', models.IntegerField(default=0)),
+                ('completed_lines', models.IntegerField(default=0)),
+                ('day', models.DateField()),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='store.category')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='store.products')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='monthlysales',
+            index=models.Index(fields=['category', 'month'], name='store_monthly_category_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='monthlysales',
+            unique_together={('month', 'product')},
+        ),
+        migrations.AddIndex(
+            model_name='dailysales',
+            index=models.Index(fields=['category', 'day'], name='store_daily_category_day_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='dailysales',
+            unique_together={('day', 'product')},
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 3.1.7 on 2026-10-18 02:47
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def record_opening_balances(apps, schema_editor):
+    # the ledger starts from the stock already on hand, so every tracked
+    # product's movements sum to its balance from the first day
+    Products = apps.get_model('store', 'Products')
+    StockMovement = apps.get_model('store', 'StockMovement')
+    tracked = Products.objects.filter(stock__gt=0).order_by('id').values_list('id', 'stock')
+    StockMovement.objects.bulk_create(
+        (StockMovement(product_id=product_id, kind='opening', quantity=stock, reference='migration')
+         for product_id, stock in tracked.iterator()),
+        batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0018_product_category_price_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='products',
+            name='reorder_level',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='products',
+            name='reorder_required',
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('opening', 'Opening balance'), ('receipt', 'Purchase receipt'), ('sale', 'Sale'), ('adjustment', 'Adjustment')], max_length=16)),
+                ('quantity', models.IntegerField()),
+                ('reference', models.CharField(blank=True, default='', max_length=64)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='store.products')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='stockmovement',
+            index=models.Index(fields=['product', 'id'], name='store_stock_product_id_idx'),
+        ),
+        migrations.RunPython(record_opening_balances, migrations.RunPython.noop),
+    ]
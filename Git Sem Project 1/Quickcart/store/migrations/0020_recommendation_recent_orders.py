@@ -0,0 +1,18 @@
+# Generated by Django 3.1.7 on 2026-10-18 03:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0019_stock_ledger'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recommendationstate',
+            name='recent_order_ids',
+            field=models.JSONField(default=list),
+        ),
+    ]
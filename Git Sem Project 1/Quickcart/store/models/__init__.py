@@ -1,4 +1,9 @@
 from .product import Products
 from .category import Category
 from  .customer import  Customer
-from  .orders import  Order
\ No newline at end of file
+from  .orders import  Order
+from  .checkout import  CheckoutToken
+from  .sales import  DailySales, MonthlySales
+from  .job import  Job
+from  .recommendation import  CoPurchase, Recommendation, RecommendationState
+from  .stock import  StockMovement
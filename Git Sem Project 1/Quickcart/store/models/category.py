@@ -1,11 +1,15 @@
 from django.db import models
+from store.objectcache import ObjectCache
 
 class Category(models.Model):
     name= models.CharField(max_length=50)
 
     @staticmethod
     def get_all_categories():
-        return Category.objects.all()
+        return category_cache.all()
 
     def __str__(self):
         return self.name
+
+
+category_cache = ObjectCache(Category)
@@ -0,0 +1,20 @@
+from django.db import models
+from .customer import Customer
+import datetime
+
+
+class CheckoutToken(models.Model):
+    # One row per submitted checkout form; the unique token makes a
+    # double-submitted form fail on insert instead of placing the order twice.
+    token = models.CharField(max_length=32, unique=True)
+    customer = models.ForeignKey(Customer,
+                                 on_delete=models.CASCADE)
+    date = models.DateField(default=datetime.datetime.today)
+
+    @staticmethod
+    def claim(token, customer_id):
+        return CheckoutToken.objects.create(token=token, customer_id=customer_id)
+
+    @staticmethod
+    def is_claimed(token):
+        return CheckoutToken.objects.filter(token=token).exists()
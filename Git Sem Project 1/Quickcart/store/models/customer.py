@@ -4,24 +4,29 @@ class Customer(models.Model):
     first_name = models.CharField(max_length=50)
     last_name = models.CharField (max_length=50)
     phone = models.CharField(max_length=10)
-    email=models.EmailField()
+    email=models.EmailField(unique=True)
     password = models.CharField(max_length=100)
 
     #to save the data
     def register(self):
         self.save()
 
+    def save(self, *args, **kwargs):
+        self.email = Customer.normalize_email(self.email)
+        super().save(*args, **kwargs)
+
+    @staticmethod
+    def normalize_email(email):
+        # addresses are stored lower-cased so lookups hit the unique index
+        return (email or '').strip().lower()
 
     @staticmethod
     def get_customer_by_email(email):
         try:
-            return Customer.objects.get(email= email)
-        except:
+            return Customer.objects.get(email= Customer.normalize_email(email))
+        except Customer.DoesNotExist:
             return False
 
 
     def isExists(self):
-        if Customer.objects.filter(email = self.email):
-            return True
-
-        return False
\ No newline at end of file
+        return Customer.objects.filter(email = Customer.normalize_email(self.email)).exists()
\ No newline at end of file
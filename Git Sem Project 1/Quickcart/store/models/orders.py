@@ -1,6 +1,8 @@
 from django.db import models
+from django.db.models import F
 from .product import Products
 from .customer import Customer
+from store.pagination import keyset_paginate, PAGE_SIZE
 import datetime
 
 
@@ -16,11 +18,28 @@ class Order(models.Model):
     date = models.DateField (default=datetime.datetime.today)
     status = models.BooleanField (default=False)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['customer', '-date', '-id'], name='store_order_customer_date_idx'),
+            models.Index(fields=['date'], name='store_order_date_idx'),
+            models.Index(fields=['status', 'date'], name='store_order_status_date_idx'),
+        ]
+
+    def __str__(self):
+        return f'Order #{self.id}'
+
     def placeOrder(self):
         self.save()
 
     @staticmethod
     def get_orders_by_customer(customer_id):
-        return Order.objects.filter(customer=customer_id).order_by('-date')
-    
+        return Order.objects.filter(customer=customer_id) \
+            .select_related('product') \
+            .annotate(line_total=F('price') * F('quantity')) \
+            .order_by('-date', '-id')
+
+    @staticmethod
+    def get_orders_page(customer_id, after=None, limit=PAGE_SIZE):
+        return keyset_paginate(Order.get_orders_by_customer(customer_id),
+                               ('-date', '-id'), after, limit)
 
@@ -1,15 +1,48 @@
 from django.db import models
+from django.db.models import Case, Count, F, Value, When
 from .category import Category
+from store.pagination import keyset_paginate, PAGE_SIZE
+from store.objectcache import ObjectCache
+
+
 class Products(models.Model):
+    # supplier's stock keeping unit; the key catalog imports upsert on
+    sku = models.CharField(max_length=64, unique=True, null=True, blank=True)
     name = models.CharField(max_length=60)
     price= models.IntegerField(default=0)
     category= models.ForeignKey(Category,on_delete=models.CASCADE,default=1 )
     description= models.CharField(max_length=250, default='', blank=True, null= True)
     image= models.ImageField(upload_to='uploads/products/')
+    # units on hand; empty means stock is not tracked for this product.
+    # Changed only through store.models.stock.StockMovement, which keeps it
+    # equal to the sum of the product's ledger.
+    stock= models.PositiveIntegerField(null=True, blank=True)
+    reorder_level= models.PositiveIntegerField(default=0)
+    # stock below reorder_level, updated with every movement
+    reorder_required= models.BooleanField(default=False, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['price', 'id'], name='store_product_price_id_idx'),
+            # category pages filtered by price and sorted by it, and the
+            # facet counts, which read nothing but these columns
+            models.Index(fields=['category', 'price', 'id'], name='store_product_cat_price_idx'),
+        ]
+
+    # sort orders usable with get_products_page; each ends in the primary
+    # key so the keyset cursor is unique
+    ORDERINGS = {
+        'id': ('id',),
+        'price': ('price', 'id'),
+        'price_desc': ('-price', '-id'),
+        'newest': ('-id',),
+    }
 
     @staticmethod
     def get_products_by_id(ids):
-        return Products.objects.filter (id__in=ids)
+        # served from the object cache; only uncached ids reach the database
+        products = product_cache.get_many (ids)
+        return [products[product_id] for product_id in sorted (products)]
     @staticmethod
     def get_all_products():
         return Products.objects.all()
@@ -19,4 +52,63 @@ class Products(models.Model):
         if category_id:
             return Products.objects.filter (category=category_id)
         else:
-            return Products.get_all_products();
\ No newline at end of file
+            return Products.get_all_products();
+
+    @staticmethod
+    def get_products_page(category_id=None, after=None, order='id', limit=PAGE_SIZE, price_range=None):
+        # ``price_range`` is (lowest, below); either end may be None
+        queryset = Products.get_all_products_by_categoryid(category_id)
+        low, high = price_range or (None, None)
+        if low is not None:
+            queryset = queryset.filter(price__gte=low)
+        if high is not None:
+            queryset = queryset.filter(price__lt=high)
+        ordering = Products.ORDERINGS.get(order, Products.ORDERINGS['id'])
+        return keyset_paginate(queryset, ordering, after, limit)
+
+    @staticmethod
+    def count_by_category_and_price(bounds):
+        # {(category id, band): products} from one grouped query. Band i
+        # holds the prices below bounds[i], the last band everything else.
+        band = Case(*[When(price__lt=bound, then=Value(index)) for index, bound in enumerate(bounds)],
+                    default=Value(len(bounds)), output_field=models.IntegerField())
+        rows = Products.objects.annotate(band=band).values('category_id', 'band') \
+            .annotate(count=Count('id')).order_by()
+        return {(row['category_id'], row['band']): row['count'] for row in rows}
+
+    @staticmethod
+    def reserve_stock(quantities, reference=''):
+        # Takes {product id: quantity} and records a sale movement for each
+        # tracked product. Returns the ids that could not be reserved; call
+        # inside the order's transaction and roll back on any.
+        from .stock import StockMovement  # stock.py imports this module
+        short = StockMovement.apply({product_id: -quantity for product_id, quantity in quantities.items()},
+                                    StockMovement.SALE, reference)
+        if short:
+            untracked = set(Products.objects.filter(id__in=short, stock__isnull=True)
+                            .values_list('id', flat=True))
+            short = [product_id for product_id in short if product_id not in untracked]
+        return short
+
+    @staticmethod
+    def refresh_reorder_flags(queryset):
+        # after reorder levels change; movements keep the flag current otherwise
+        return queryset.update(reorder_required=reorder_required(F('stock')))
+
+    @staticmethod
+    def get_low_stock():
+        return Products.objects.filter(reorder_required=True).select_related('category') \
+            .annotate(shortfall=F('reorder_level') - F('stock')) \
+            .order_by('category__name', 'name', 'id')
+
+
+def reorder_required(stock):
+    # the reorder flag for a balance expression; null (untracked) stock never
+    # needs reordering
+    if stock is None:
+        return Value(False)
+    return Case(When(reorder_level__gt=stock, then=Value(True)),
+                default=Value(False), output_field=models.BooleanField())
+
+
+product_cache = ObjectCache(Products)
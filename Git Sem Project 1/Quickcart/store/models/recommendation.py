@@ -0,0 +1,58 @@
+from django.db import models
+from .product import Products
+
+
+class CoPurchase(models.Model):
+    # One non-zero cell of the product co-occurrence matrix: the number of
+    # baskets (one customer's lines on one day) holding both products. The
+    # diagonal (product == other) counts the baskets holding the product at
+    # all. Both directions are stored so a row's neighbours are one range.
+    product = models.ForeignKey(Products,
+                                on_delete=models.CASCADE,
+                                related_name='+')
+    other = models.ForeignKey(Products,
+                              on_delete=models.CASCADE,
+                              related_name='+')
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = [('product', 'other')]
+
+
+class Recommendation(models.Model):
+    # The top-K neighbours of each product by cosine similarity, rebuilt by
+    # `manage.py build_recommendations`.
+    product = models.ForeignKey(Products,
+                                on_delete=models.CASCADE,
+                                related_name='+')
+    recommended = models.ForeignKey(Products,
+                                    on_delete=models.CASCADE,
+                                    related_name='+')
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        unique_together = [('product', 'rank')]
+
+    @staticmethod
+    def for_products(product_ids, limit=4):
+        # products most often bought with any of ``product_ids``, best first
+        product_ids = list(product_ids)
+        best = {}
+        for recommended, score in Recommendation.objects.filter(product__in=product_ids) \
+                .exclude(recommended__in=product_ids) \
+                .values_list('recommended_id', 'score'):
+            best[recommended] = max(score, best.get(recommended, 0))
+        return sorted(best, key=lambda product_id: (-best[product_id], product_id))[:limit]
+
+
+class RecommendationState(models.Model):
+    # single row: the highest order id folded into CoPurchase, and which of
+    # the ids in the window just below it were, since orders commit out of
+    # id order and a lower id can still turn up
+    last_order_id = models.IntegerField(default=0)
+    recent_order_ids = models.JSONField(default=list)
+
+    @staticmethod
+    def get():
+        return RecommendationState.objects.get_or_create(id=1)[0]
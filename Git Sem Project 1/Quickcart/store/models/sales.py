@@ -0,0 +1,45 @@
+from django.db import models
+from .product import Products
+from .category import Category
+
+
+class SalesRollup(models.Model):
+    # Running totals of Order lines for one product over one period, kept
+    # current by store.rollups as orders are placed, change status or go
+    # away, so the dashboard never has to scan the orders table.
+    # ``category`` is the product's category when the row was created: a
+    # product moved to another category keeps its earlier rows under the
+    # old one until `manage.py rebuild_sales_rollups` recomputes them.
+    product = models.ForeignKey(Products,
+                                on_delete=models.CASCADE)
+    category = models.ForeignKey(Category,
+                                 on_delete=models.CASCADE)
+    quantity = models.IntegerField(default=0)
+    revenue = models.IntegerField(default=0)
+    lines = models.IntegerField(default=0)
+    completed_revenue = models.IntegerField(default=0)
+    completed_lines = models.IntegerField(default=0)
+
+    class Meta:
+        abstract = True
+
+
+class DailySales(SalesRollup):
+    day = models.DateField()
+
+    class Meta:
+        unique_together = [('day', 'product')]
+        indexes = [
+            models.Index(fields=['category', 'day'], name='store_daily_category_day_idx'),
+        ]
+
+
+class MonthlySales(SalesRollup):
+    # ``month`` is the first day of the month
+    month = models.DateField()
+
+    class Meta:
+        unique_together = [('month', 'product')]
+        indexes = [
+            models.Index(fields=['category', 'month'], name='store_monthly_category_idx'),
+        ]
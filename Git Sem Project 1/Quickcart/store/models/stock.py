@@ -0,0 +1,102 @@
+from django.db import models
+from django.db.models import F, Sum
+from .product import Products, reorder_required
+
+
+class StockMovement(models.Model):
+    # One append-only line of the stock ledger. A product's stock is the
+    # sum of its movements; Products.stock holds that sum, updated in the
+    # same transaction as every line, and `manage.py reconcile_stock`
+    # checks the two agree.
+    OPENING = 'opening'
+    RECEIPT = 'receipt'
+    SALE = 'sale'
+    ADJUSTMENT = 'adjustment'
+    KINDS = [
+        (OPENING, 'Opening balance'),
+        (RECEIPT, 'Purchase receipt'),
+        (SALE, 'Sale'),
+        (ADJUSTMENT, 'Adjustment'),
+    ]
+
+    product = models.ForeignKey(Products,
+                                on_delete=models.CASCADE)
+    kind = models.CharField(max_length=16, choices=KINDS)
+    # signed: receipts add stock, sales take it away
+    quantity = models.IntegerField()
+    # purchase order number, checkout token or who made the adjustment
+    reference = models.CharField(max_length=64, default='', blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['product', 'id'], name='store_stock_product_id_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.get_kind_display()} of {self.quantity:+d} for product #{self.product_id}'
+
+    def save(self, *args, **kwargs):
+        if self.pk:
+            raise ValueError('Stock movements cannot be changed; record an adjustment instead')
+        super().save(*args, **kwargs)
+
+    @staticmethod
+    def apply(quantities, kind, reference=''):
+        # Applies {product id: signed quantity} to each tracked product with
+        # one conditional UPDATE that also refreshes its reorder flag, so
+        # no row is read first and the database refuses to go below zero,
+        # then appends the movements. Returns the ids left untouched, because
+        # they would go negative or do not track stock.
+        refused, movements = [], []
+        for product_id in sorted(quantities):
+            quantity = quantities[product_id]
+            if not quantity:
+                continue
+            balance = F('stock') + quantity
+            updated = Products.objects.filter(id=product_id, stock__gte=max(0, -quantity)) \
+                .update(stock=balance, reorder_required=reorder_required(balance))
+            if updated:
+                movements.append(StockMovement(product_id=product_id, kind=kind,
+                                               quantity=quantity, reference=reference[:64]))
+            else:
+                refused.append(product_id)
+        StockMovement.objects.bulk_create(movements)
+        return refused
+
+    @staticmethod
+    def receive(quantities, reference=''):
+        return StockMovement.apply(quantities, StockMovement.RECEIPT, reference)
+
+    @staticmethod
+    def set_levels(levels, reference=''):
+        # Takes {product id: units on hand, or None to stop tracking} and
+        # records each difference from the current balance as an adjustment.
+        # A product that starts tracking again continues from its ledger.
+        current = dict(Products.objects.select_for_update().filter(id__in=list(levels))
+                       .values_list('id', 'stock'))
+        ledger = StockMovement.balances([product_id for product_id, stock in current.items() if stock is None])
+        movements = []
+        for product_id in sorted(current):
+            on_hand = levels[product_id]
+            if on_hand == current[product_id]:
+                continue
+            Products.objects.filter(id=product_id) \
+                .update(stock=on_hand, reorder_required=reorder_required(on_hand))
+            if on_hand is None:
+                continue
+            previous = current[product_id] if current[product_id] is not None else ledger.get(product_id, 0)
+            if on_hand != previous:
+                movements.append(StockMovement(product_id=product_id, kind=StockMovement.ADJUSTMENT,
+                                               quantity=on_hand - previous, reference=reference[:64]))
+        StockMovement.objects.bulk_create(movements)
+        return len(movements)
+
+    @staticmethod
+    def balances(product_ids=None):
+        # {product id: sum of its movements}, from the ledger itself
+        movements = StockMovement.objects.all()
+        if product_ids is not None:
+            movements = movements.filter(product__in=list(product_ids))
+        return dict(movements.values('product').annotate(balance=Sum('quantity')).order_by()
+                    .values_list('product', 'balance'))
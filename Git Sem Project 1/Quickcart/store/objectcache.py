@@ -0,0 +1,109 @@
+import threading
+from collections import OrderedDict
+
+from django.core.cache import cache
+
+from store import routers
+
+OBJECT_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def _catalog_version():
+    # imported here: store.catalog imports the models that use this cache
+    from store.catalog import get_catalog_version
+    return get_catalog_version()
+
+
+class ObjectCache:
+    """Read-through cache of model instances by primary key.
+
+    Lookups try a bounded per-process LRU first, then the shared Django
+    cache, and only the ids missing from both reach the database, in one
+    query. Every key carries the catalog version, which the model signals
+    and the bulk catalog paths bump on each write, so a save or delete
+    anywhere invalidates every process. Cached instances are shared between
+    requests: treat them as read-only, and read ``stock`` from the database
+    where it matters, since stock reservations do not bump the version.
+    Misses are loaded from the primary, never a replica that may lag.
+    """
+
+    def __init__(self, model, max_local=2048, timeout=OBJECT_CACHE_TIMEOUT):
+        self.model = model
+        self.prefix = f'objects:{model._meta.label_lower}'
+        self.max_local = max_local
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.local = OrderedDict()
+
+    def _key(self, version, pk):
+        return f'{self.prefix}:{version}:{pk}'
+
+    def _local_get(self, version, pks):
+        found = {}
+        with self.lock:
+            for pk in pks:
+                entry = self.local.get(pk)
+                if entry is not None and entry[0] == version:
+                    self.local.move_to_end(pk)
+                    found[pk] = entry[1]
+        return found
+
+    def _local_set(self, version, objects):
+        with self.lock:
+            for pk, obj in objects.items():
+                self.local[pk] = (version, obj)
+                self.local.move_to_end(pk)
+            while len(self.local) > self.max_local:
+                self.local.popitem(last=False)
+
+    def get_many(self, pks):
+        """Return ``{pk: instance}`` for those of ``pks`` that exist."""
+        pks = {int(pk) for pk in pks}
+        if not pks:
+            return {}
+        version = _catalog_version()
+        found = self._local_get(version, pks)
+        missing = pks - found.keys()
+        if missing:
+            keys = {self._key(version, pk): pk for pk in missing}
+            shared = {keys[key]: obj for key, obj in cache.get_many(list(keys)).items()}
+            missing -= shared.keys()
+            loaded = {}
+            if missing:
+                with routers.primary():
+                    loaded = self.model.objects.in_bulk(list(missing))
+            if loaded:
+                cache.set_many({self._key(version, pk): obj for pk, obj in loaded.items()}, self.timeout)
+            self._local_set(version, {**shared, **loaded})
+            found.update(shared)
+            found.update(loaded)
+        return found
+
+    def get(self, pk):
+        return self.get_many([pk]).get(int(pk))
+
+    def all(self):
+        """Every row of a small table, cached as one entry."""
+        version = _catalog_version()
+        found = self._local_get(version, ['all'])
+        if 'all' in found:
+            return found['all']
+        key = self._key(version, 'all')
+        objects = cache.get(key)
+        if objects is None:
+            with routers.primary():
+                objects = list(self.model.objects.all())
+            cache.set(key, objects, self.timeout)
+        self._local_set(version, {'all': objects})
+        return objects
+
+    def invalidate(self, pks=None):
+        """Forget ``pks`` (or everything) in this process and the shared cache."""
+        version = _catalog_version()
+        with self.lock:
+            if pks is None:
+                self.local.clear()
+            else:
+                for pk in pks:
+                    self.local.pop(pk, None)
+        cache.delete_many([self._key(version, pk) for pk in (pks or [])] + [self._key(version, 'all')])
@@ -0,0 +1,36 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, make_password
+
+# PBKDF2 is deliberately slow; it runs on a small dedicated pool so a burst
+# of logins queues behind itself instead of tying up the request workers.
+# hashlib releases the GIL while hashing, so threads give real parallelism.
+WORKERS = getattr(settings, 'PASSWORD_HASHING_WORKERS', 2)
+MAX_PENDING = getattr(settings, 'PASSWORD_HASHING_MAX_PENDING', 32)
+
+_executor = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix='password-hashing')
+_pending = threading.BoundedSemaphore(MAX_PENDING)
+
+
+class HashingBusy(Exception):
+    """Raised when too many hashes are already queued."""
+
+
+async def _run(function, *args):
+    if not _pending.acquire(blocking=False):
+        raise HashingBusy()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_executor, function, *args)
+    finally:
+        _pending.release()
+
+
+async def check_password_async(password, encoded):
+    return await _run(check_password, password, encoded)
+
+
+async def make_password_async(password):
+    return await _run(make_password, password)
@@ -0,0 +1,62 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+class TokenBucket:
+    """Token bucket kept in the shared cache, one bucket per key.
+
+    ``capacity`` requests may arrive at once, refilled at ``rate`` tokens per
+    second. The read-then-write on the cache is not atomic, so under heavy
+    contention a few extra requests can slip through; that is acceptable for
+    flood protection, which is all this is for.
+    """
+
+    def __init__(self, name, capacity, rate):
+        self.name = name
+        self.capacity = capacity
+        self.rate = rate
+
+    def consume(self, key, tokens=1):
+        cache_key = f'ratelimit:{self.name}:{key}'
+        now = time.time()
+        available, updated = cache.get(cache_key, (self.capacity, now))
+        available = min(self.capacity, available + (now - updated) * self.rate)
+        allowed = available >= tokens
+        if allowed:
+            available -= tokens
+        timeout = int((self.capacity - available) / self.rate) + 1
+        cache.set(cache_key, (available, now), timeout)
+        return allowed
+
+
+# 20 attempts per address, refilling one every 3 seconds; 5 per account from
+# any one address, refilling one a minute. The account bucket is also keyed
+# on the address so guessing at someone's password cannot lock them out.
+login_by_ip = TokenBucket('login-ip', 20, 1 / 3)
+login_by_email = TokenBucket('login-email', 5, 1 / 60)
+signup_by_ip = TokenBucket('signup-ip', 10, 1 / 30)
+
+
+def client_ip(request):
+    """The address of the client, looking through trusted proxies.
+
+    When the peer is one of TRUSTED_PROXIES, X-Forwarded-For is read from
+    the right, skipping further trusted proxies, and the first other address
+    is the client's. Anything to the left of it could be made up by the
+    client, so it is never used.
+    """
+    address = request.META.get('REMOTE_ADDR', '')
+    trusted = settings.TRUSTED_PROXIES
+    if address not in trusted:
+        return address
+    forwarded = [hop.strip() for hop in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')]
+    for hop in reversed(forwarded):
+        if hop and hop not in trusted:
+            return hop
+    return address
+
+
+def login_key(email, request):
+    return f'{email}|{client_ip(request)}'
@@ -0,0 +1,233 @@
+from itertools import islice
+
+import numpy as np
+from django.db import transaction
+from django.db.models import F, Max
+
+from store.models.orders import Order
+from store.models.recommendation import CoPurchase, Recommendation, RecommendationState
+
+TOP_K = 10
+# a basket of n products yields n * n pairs; bigger ones are bulk or wholesale
+# orders that say little about what goes together
+MAX_BASKET_SIZE = 50
+# pairs expanded per numpy step, to bound memory on large order tables
+CHUNK_PAIRS = 4000000
+LOOKUP_CHUNK = 500
+# order lines turned into arrays at a time
+LINE_CHUNK = 100000
+# order ids below the newest one that are looked at again on each refresh,
+# for orders whose transactions committed after a higher id's had
+SAFETY_WINDOW = 1000
+EMPTY = np.zeros(0, dtype=np.int64)
+
+
+def _chunks(values, size=LOOKUP_CHUNK):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def basket_arrays(lines):
+    """(basket number, product id) arrays from ``(customer id, date, product id)``.
+
+    Baskets are one customer's lines on one day; a product ordered twice in
+    a basket counts once. ``lines`` is consumed LINE_CHUNK rows at a time,
+    so only compact arrays are held, never every row as Python tuples.
+    """
+    lines = iter(lines)
+    parts = []
+    while True:
+        chunk = list(islice(lines, LINE_CHUNK))
+        if not chunk:
+            break
+        parts.append(np.unique(np.array([(customer_id, day.toordinal(), product_id)
+                                         for customer_id, day, product_id in chunk],
+                                        dtype=np.int64), axis=0))
+    if not parts:
+        return EMPTY, EMPTY
+    data = np.unique(np.concatenate(parts), axis=0)
+    changed = np.any(data[1:, :2] != data[:-1, :2], axis=1)
+    basket = np.concatenate([[0], np.cumsum(changed)])
+    return basket, data[:, 2]
+
+
+def pair_counts(basket, product):
+    """Sparse co-occurrence counts as parallel (product, other, count) arrays.
+
+    Every basket is expanded into all of its (product, other) pairs,
+    diagonal included, and identical pairs are summed: the sparse form of
+    B.T @ B for the basket-by-product incidence matrix B.
+    """
+    if not len(product):
+        return EMPTY, EMPTY, EMPTY
+    starts = np.flatnonzero(np.concatenate([[True], basket[1:] != basket[:-1]]))
+    sizes = np.diff(np.concatenate([starts, [len(basket)]]))
+    keep = sizes <= MAX_BASKET_SIZE
+    starts, sizes = starts[keep], sizes[keep]
+    if not len(sizes):
+        return EMPTY, EMPTY, EMPTY
+    span = int(product.max()) + 1
+
+    codes, counts = [], []
+    chunk_of = np.cumsum(sizes * sizes) // CHUNK_PAIRS
+    for chunk in np.unique(chunk_of):
+        chunk_starts, chunk_sizes = starts[chunk_of == chunk], sizes[chunk_of == chunk]
+        # each element of a basket is paired with every element of it
+        element = np.repeat(chunk_starts, chunk_sizes) + \
+            (np.arange(chunk_sizes.sum()) - np.repeat(np.cumsum(chunk_sizes) - chunk_sizes, chunk_sizes))
+        repeats = np.repeat(chunk_sizes, chunk_sizes)
+        left = np.repeat(element, repeats)
+        offsets = np.arange(len(left)) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+        right = np.repeat(np.repeat(chunk_starts, chunk_sizes), repeats) + offsets
+        unique, count = np.unique(product[left] * span + product[right], return_counts=True)
+        codes.append(unique)
+        counts.append(count)
+
+    unique, inverse = np.unique(np.concatenate(codes), return_inverse=True)
+    totals = np.bincount(inverse, weights=np.concatenate(counts)).astype(np.int64)
+    return unique // span, unique % span, totals
+
+
+def top_k(product, other, count, k=TOP_K):
+    """Rank each product's neighbours by cosine similarity, keep the best ``k``.
+
+    Returns (product, recommended, rank, score) arrays; the diagonal of the
+    counts supplies how many baskets held each product.
+    """
+    diagonal = product == other
+    if not diagonal.any() or diagonal.all():
+        return EMPTY, EMPTY, EMPTY, np.zeros(0)
+    frequency = dict(zip(product[diagonal].tolist(), count[diagonal].tolist()))
+    product, other, count = product[~diagonal], other[~diagonal], count[~diagonal]
+    norms = np.array([frequency.get(product_id, 1) for product_id in product.tolist()], dtype=np.float64) * \
+        np.array([frequency.get(product_id, 1) for product_id in other.tolist()], dtype=np.float64)
+    score = count / np.sqrt(norms)
+    order = np.lexsort((other, -score, product))
+    product, other, score = product[order], other[order], score[order]
+    starts = np.flatnonzero(np.concatenate([[True], product[1:] != product[:-1]]))
+    sizes = np.diff(np.concatenate([starts, [len(product)]]))
+    rank = np.arange(len(product)) - np.repeat(starts, sizes)
+    keep = rank < k
+    return product[keep], other[keep], rank[keep], score[keep]
+
+
+def _recent(order_ids, last):
+    return sorted(order_id for order_id in order_ids if order_id > last - SAFETY_WINDOW)
+
+
+def _save_recommendations(product, other, rank, score):
+    Recommendation.objects.bulk_create(
+        (Recommendation(product_id=product_id, recommended_id=recommended_id, rank=position, score=value)
+         for product_id, recommended_id, position, value
+         in zip(product.tolist(), other.tolist(), rank.tolist(), score.tolist())),
+        batch_size=5000)
+
+
+def rebuild_recommendations(k=TOP_K):
+    """Recount every basket and replace both tables."""
+    with transaction.atomic():
+        last = Order.objects.aggregate(last=Max('id'))['last'] or 0
+        lines = Order.objects.filter(id__lte=last).values_list('customer_id', 'date', 'product_id')
+        product, other, count = pair_counts(*basket_arrays(lines.iterator(chunk_size=10000)))
+        CoPurchase.objects.all().delete()
+        CoPurchase.objects.bulk_create(
+            (CoPurchase(product_id=product_id, other_id=other_id, count=value)
+             for product_id, other_id, value in zip(product.tolist(), other.tolist(), count.tolist())),
+            batch_size=5000)
+        Recommendation.objects.all().delete()
+        _save_recommendations(*top_k(product, other, count, k))
+        state = RecommendationState.get()
+        state.last_order_id = last
+        state.recent_order_ids = _recent(Order.objects.filter(id__gt=last - SAFETY_WINDOW, id__lte=last)
+                                         .values_list('id', flat=True), last)
+        state.save()
+    return len(count)
+
+
+def refresh_recommendations(k=TOP_K):
+    """Fold orders placed since the last run into the counts.
+
+    New orders are those above the last run's highest id, plus any in the
+    SAFETY_WINDOW ids below it that the last run did not see because they
+    committed late. Only the baskets they belong to are recounted: their
+    pairs with and without the new lines differ by exactly the new
+    co-occurrences. Then only the products whose counts changed are
+    re-ranked; a product whose neighbour merely became more popular keeps
+    its old ranking until the next full rebuild. Returns the number of
+    products re-ranked.
+    """
+    with transaction.atomic():
+        state = RecommendationState.get()
+        previous = state.last_order_id
+        seen = set(state.recent_order_ids)
+        window = Order.objects.filter(id__gt=previous - SAFETY_WINDOW) \
+            .values_list('id', 'customer_id', 'date')
+        new = [(order_id, customer_id, day) for order_id, customer_id, day in window
+               if order_id > previous or order_id not in seen]
+        if not new:
+            return 0
+        last = max(previous, max(order_id for order_id, _, _ in new))
+        counted = seen | {order_id for order_id, _, _ in new}
+
+        def was_counted(order_id):
+            # anything older than the window was counted or is given up on
+            return order_id <= previous - SAFETY_WINDOW or order_id in seen
+
+        baskets = {(customer_id, day) for _, customer_id, day in new}
+        lines = []
+        for customers in _chunks({customer_id for customer_id, _ in baskets}):
+            lines += [line for line in Order.objects.filter(customer_id__in=customers, id__lte=last,
+                                                            date__in={day for _, day in baskets})
+                      .values_list('id', 'customer_id', 'date', 'product_id')
+                      if (line[1], line[2]) in baskets
+                      and (was_counted(line[0]) or line[0] in counted)]
+        after = pair_counts(*basket_arrays(line[1:] for line in lines))
+        before = pair_counts(*basket_arrays(line[1:] for line in lines if was_counted(line[0])))
+
+        product = np.concatenate([after[0], before[0]])
+        other = np.concatenate([after[1], before[1]])
+        deltas = {}
+        if len(product):
+            span = int(max(product.max(), other.max())) + 1
+            unique, inverse = np.unique(product * span + other, return_inverse=True)
+            delta = np.bincount(inverse, weights=np.concatenate([after[2], -before[2]])).astype(np.int64)
+            changed = delta != 0
+            deltas = dict(zip(zip((unique[changed] // span).tolist(), (unique[changed] % span).tolist()),
+                              delta[changed].tolist()))
+
+        affected = sorted({product_id for product_id, _ in deltas})
+        for products in _chunks(affected):
+            chunk = set(products)
+            existing = {(row.product_id, row.other_id): row
+                        for row in CoPurchase.objects.filter(product__in=products)}
+            updated, created = [], []
+            for key in [key for key in deltas if key[0] in chunk]:
+                row = existing.get(key)
+                if row is None:
+                    created.append(CoPurchase(product_id=key[0], other_id=key[1], count=deltas[key]))
+                else:
+                    row.count += deltas[key]
+                    updated.append(row)
+            CoPurchase.objects.bulk_update(updated, ['count'], batch_size=1000)
+            CoPurchase.objects.bulk_create([row for row in created if row.count > 0], batch_size=1000)
+            # a pair no basket holds any more is not a neighbour
+            CoPurchase.objects.filter(product__in=products, count__lte=0).delete()
+
+        for products in _chunks(affected):
+            rows = list(CoPurchase.objects.filter(product__in=products).values_list('product_id', 'other_id', 'count'))
+            neighbours = {other_id for _, other_id, _ in rows}
+            # the neighbours' diagonal cells, for the similarity norms
+            for others in _chunks(neighbours):
+                rows += list(CoPurchase.objects.filter(product__in=others, other=F('product'))
+                             .values_list('product_id', 'other_id', 'count'))
+            columns = np.array(rows, dtype=np.int64).reshape(-1, 3).T
+            ranked = top_k(*columns, k)
+            keep = np.isin(ranked[0], products)
+            Recommendation.objects.filter(product__in=products).delete()
+            _save_recommendations(*(column[keep] for column in ranked))
+
+        state.last_order_id = last
+        state.recent_order_ids = _recent(counted, last)
+        state.save()
+    return len(affected)
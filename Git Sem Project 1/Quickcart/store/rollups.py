@@ -0,0 +1,136 @@
+import datetime
+from collections import defaultdict
+
+from django.db import transaction, IntegrityError
+from django.db.models import F, Sum, Count, Q
+from django.db.models.functions import TruncMonth
+
+from store.models.job import Job
+from store.models.orders import Order
+from store.models.product import Products
+from store.models.sales import DailySales, MonthlySales
+
+COUNTERS = ('quantity', 'revenue', 'lines', 'completed_revenue', 'completed_lines')
+
+
+def _as_date(value):
+    return value.date() if isinstance(value, datetime.datetime) else value
+
+
+def _month(day):
+    return day.replace(day=1)
+
+
+def _bump(model, period, key, product_id, category_id, deltas):
+    # add ``deltas`` to one rollup row with a single UPDATE, creating the
+    # row the first time the product sells in the period
+    increments = {name: F(name) + delta for name, delta in deltas.items() if delta}
+    if not increments:
+        return
+    lookup = {period: key, 'product_id': product_id}
+    if model.objects.filter(**lookup).update(**increments):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(category_id=category_id, **lookup, **deltas)
+    except IntegrityError:
+        # another transaction created it first
+        model.objects.filter(**lookup).update(**increments)
+
+
+def _apply(totals):
+    # ``totals`` maps (day, product id, category id) to counter deltas
+    monthly = defaultdict(lambda: defaultdict(int))
+    for (day, product_id, category_id), deltas in totals.items():
+        _bump(DailySales, 'day', day, product_id, category_id, deltas)
+        for name, delta in deltas.items():
+            monthly[(_month(day), product_id, category_id)][name] += delta
+    for (month, product_id, category_id), deltas in monthly.items():
+        _bump(MonthlySales, 'month', month, product_id, category_id, deltas)
+
+
+def _line_deltas(order, sign=1, counted=True, completed=None):
+    total = order.price * order.quantity
+    completed = order.status if completed is None else completed
+    deltas = {'completed_revenue': sign * total if completed else 0,
+              'completed_lines': sign if completed else 0}
+    if counted:
+        deltas.update({'quantity': sign * order.quantity,
+                       'revenue': sign * total,
+                       'lines': sign})
+    return deltas
+
+
+def _collect(orders, **kwargs):
+    orders = list(orders)
+    category_ids = dict(Products.objects.filter(id__in={order.product_id for order in orders})
+                        .values_list('id', 'category_id'))
+    totals = defaultdict(lambda: defaultdict(int))
+    for order in orders:
+        key = (_as_date(order.date), order.product_id, category_ids.get(order.product_id))
+        for name, delta in _line_deltas(order, **kwargs).items():
+            totals[key][name] += delta
+    return totals
+
+
+def record_orders(orders):
+    """Add newly placed order lines to the rollups (same transaction)."""
+    with transaction.atomic():
+        _apply(_collect(orders))
+
+
+def remove_orders(orders):
+    with transaction.atomic():
+        _apply(_collect(orders, sign=-1))
+
+
+def record_status_change(orders, completed):
+    """Move lines whose status just flipped to ``completed`` between buckets."""
+    with transaction.atomic():
+        _apply(_collect(orders, sign=1 if completed else -1, counted=False, completed=True))
+
+
+def set_order_status(queryset, completed):
+    """Flip the status of every order in ``queryset`` with one UPDATE."""
+    with transaction.atomic():
+        changing = list(queryset.select_related(None).exclude(status=completed)
+                        .only('id', 'date', 'product_id', 'price', 'quantity', 'status'))
+        if not changing:
+            return 0
+        Order.objects.filter(id__in=[order.id for order in changing]).update(status=completed)
+        record_status_change(changing, completed)
+    return len(changing)
+
+
+def rebuild_rollups():
+    """Recompute every rollup row from the orders table.
+
+    Pending record_sales jobs describe orders the rebuild already counts, so
+    they are deleted in the same transaction; one a worker is running at the
+    time finds its job gone and rolls back (see store.jobs.run_job).
+    """
+    # annotated under other names, or F('quantity') would mean the sum
+    sums = dict(sum_quantity=Sum('quantity'),
+                sum_revenue=Sum(F('price') * F('quantity')),
+                sum_lines=Count('id'),
+                sum_completed_revenue=Sum(F('price') * F('quantity'), filter=Q(status=True)),
+                sum_completed_lines=Count('id', filter=Q(status=True)))
+    with transaction.atomic():
+        Job.objects.filter(name='record_sales', status__in=[Job.QUEUED, Job.RUNNING]).delete()
+        DailySales.objects.all().delete()
+        MonthlySales.objects.all().delete()
+        daily = Order.objects.values('date', 'product_id', 'product__category_id') \
+            .annotate(**sums).order_by()
+        DailySales.objects.bulk_create(
+            (DailySales(day=row['date'], product_id=row['product_id'],
+                        category_id=row['product__category_id'],
+                        **{name: row['sum_' + name] or 0 for name in COUNTERS})
+             for row in daily.iterator()), batch_size=1000)
+        monthly = Order.objects.annotate(month=TruncMonth('date')) \
+            .values('month', 'product_id', 'product__category_id').annotate(**sums).order_by()
+        MonthlySales.objects.bulk_create(
+            (MonthlySales(month=row['month'], product_id=row['product_id'],
+                          category_id=row['product__category_id'],
+                          **{name: row['sum_' + name] or 0 for name in COUNTERS})
+             for row in monthly.iterator()), batch_size=1000)
+    return DailySales.objects.count(), MonthlySales.objects.count()
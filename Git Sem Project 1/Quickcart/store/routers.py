@@ -0,0 +1,86 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PIN_COOKIE = 'db_pin'
+PIN_SALT = 'store.routers'
+
+# The only models whose reads may lag: the catalog and order history.
+# Sessions, accounts, checkout tokens and jobs must be read back as soon as
+# they are written, and replicas are refreshed by hand with sync_replicas.
+REPLICA_MODELS = {'store.Products', 'store.Category', 'store.Order'}
+
+# per-request routing state, installed by replica_middleware; code running
+# outside a request (management commands, shells) always uses the primary
+_state = ContextVar('store_db_routing', default=None)
+# set by primary(), for reads whose results outlive the request
+_primary = ContextVar('store_db_primary', default=False)
+
+
+class RoutingState:
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.wrote = False
+
+
+def begin_request(pinned):
+    return _state.set(RoutingState(pinned))
+
+
+def end_request(token):
+    state = _state.get()
+    _state.reset(token)
+    return state
+
+
+@contextmanager
+def primary():
+    """Read from the primary inside the block.
+
+    For anything filling a cache shared by every request: the entry is
+    stored under the current catalog version, so a lagging replica's rows
+    would be served as current until the next catalog change.
+    """
+    token = _primary.set(True)
+    try:
+        yield
+    finally:
+        _primary.reset(token)
+
+
+def replica_aliases():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+class PrimaryReplicaRouter:
+    """Sends request reads of REPLICA_MODELS to a random replica and
+    everything else, writes included, to the primary.
+
+    Reads stay on the primary inside a transaction and primary() blocks, for
+    the rest of a request that has written, and while the browser carries the
+    pin cookie set after its last write.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        replicas = replica_aliases()
+        if (model._meta.label not in REPLICA_MODELS or state is None or _primary.get() or state.pinned
+                or state.wrote or not replicas or connections[DEFAULT_DB_ALIAS].in_atomic_block):
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return True
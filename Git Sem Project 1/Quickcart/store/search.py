@@ -0,0 +1,220 @@
+import bisect
+import math
+import re
+import threading
+from collections import defaultdict
+
+from django.db import connection, connections, router, OperationalError
+
+from store.models.product import Products
+from store.catalog import get_catalog_version
+
+FTS_TABLE = 'store_products_fts'
+SEARCH_LIMIT = 48
+
+# relative weight of a hit in each searchable column
+NAME_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+CATEGORY_WEIGHT = 4.0
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(text):
+    return TOKEN_RE.findall((text or '').lower())
+
+
+def _documents(products):
+    return [(product.id, product.name, product.description or '',
+             product.category.name, product.category_id)
+            for product in products]
+
+
+class FtsSearchBackend:
+    """SQLite FTS5 index, one row per product keyed by the product id."""
+
+    def index(self, products):
+        rows = _documents(products)
+        if not rows:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+                               [(row[0],) for row in rows])
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (rowid, name, description, category, category_id) '
+                f'VALUES (%s, %s, %s, %s, %s)', rows)
+
+    def remove(self, product_ids):
+        with connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+                               [(product_id,) for product_id in product_ids])
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, name, description, category, category_id) '
+                f'SELECT p.id, p.name, COALESCE(p.description, \'\'), c.name, p.category_id '
+                f'FROM store_products p JOIN store_category c ON c.id = p.category_id')
+
+    def search(self, query, category_id=None, limit=SEARCH_LIMIT):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        # every term must match; the last one is a prefix so results
+        # follow the shopper while they are still typing
+        match = ' '.join(f'"{token}"' for token in tokens[:-1])
+        match = f'{match} "{tokens[-1]}"*'.strip()
+        sql = f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s'
+        params = [match]
+        if category_id:
+            sql += ' AND category_id = %s'
+            params.append(int(category_id))
+        sql += (f' ORDER BY bm25({FTS_TABLE}, {NAME_WEIGHT}, {DESCRIPTION_WEIGHT}, '
+                f'{CATEGORY_WEIGHT}) LIMIT %s')
+        params.append(limit)
+        with connections[router.db_for_read(Products)].cursor() as cursor:
+            cursor.execute(sql, params)
+            return [row[0] for row in cursor.fetchall()]
+
+
+class InvertedIndexBackend:
+    """In-process inverted index for backends without FTS5.
+
+    Kept current by the model signals of this process; a change made by
+    another process shows up as a new catalog version and triggers a rebuild
+    on the next search.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.postings = defaultdict(dict)
+        self.documents = {}
+        self.terms = []
+        self.version = None
+
+    def _add(self, product_id, name, description, category, category_id):
+        weights = defaultdict(float)
+        for text, weight in ((name, NAME_WEIGHT), (description, DESCRIPTION_WEIGHT),
+                             (category, CATEGORY_WEIGHT)):
+            for token in tokenize(text):
+                weights[token] += weight
+        for token, weight in weights.items():
+            self.postings[token][product_id] = weight
+        self.documents[product_id] = (category_id, list(weights))
+
+    def _remove(self, product_id):
+        document = self.documents.pop(product_id, None)
+        if document is None:
+            return
+        for token in document[1]:
+            postings = self.postings.get(token)
+            if postings is not None:
+                postings.pop(product_id, None)
+                if not postings:
+                    del self.postings[token]
+
+    def _refresh_terms(self):
+        self.terms = sorted(self.postings)
+
+    def index(self, products):
+        with self.lock:
+            for document in _documents(products):
+                self._remove(document[0])
+                self._add(*document)
+            self._refresh_terms()
+            self.version = get_catalog_version()
+
+    def remove(self, product_ids):
+        with self.lock:
+            for product_id in product_ids:
+                self._remove(product_id)
+            self._refresh_terms()
+            self.version = get_catalog_version()
+
+    def rebuild(self):
+        with self.lock:
+            self.postings = defaultdict(dict)
+            self.documents = {}
+            for document in _documents(Products.objects.select_related('category').iterator()):
+                self._add(*document)
+            self._refresh_terms()
+            self.version = get_catalog_version()
+
+    def _expand(self, token):
+        start = bisect.bisect_left(self.terms, token)
+        end = bisect.bisect_left(self.terms, token + '\uffff')
+        return self.terms[start:end]
+
+    def search(self, query, category_id=None, limit=SEARCH_LIMIT):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        with self.lock:
+            if self.version != get_catalog_version():
+                self.rebuild()
+            total = len(self.documents) or 1
+            scores = None
+            for position, token in enumerate(tokens):
+                terms = self._expand(token) if position == len(tokens) - 1 else [token]
+                hits = defaultdict(float)
+                for term in terms:
+                    postings = self.postings.get(term, {})
+                    idf = math.log(1 + total / (1 + len(postings)))
+                    for product_id, weight in postings.items():
+                        hits[product_id] += weight * idf
+                if scores is None:
+                    scores = hits
+                else:
+                    scores = {product_id: score + hits[product_id]
+                              for product_id, score in scores.items() if product_id in hits}
+                if not scores:
+                    return []
+            if category_id:
+                scores = {product_id: score for product_id, score in scores.items()
+                          if self.documents[product_id][0] == int(category_id)}
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+            return [product_id for product_id, score in ranked[:limit]]
+
+
+_backend = None
+
+
+def fts_available():
+    if connection.vendor != 'sqlite':
+        return False
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT 1 FROM {FTS_TABLE} LIMIT 1')
+        return True
+    except OperationalError:
+        return False
+
+
+def get_search_backend():
+    global _backend
+    if _backend is None:
+        _backend = FtsSearchBackend() if fts_available() else InvertedIndexBackend()
+    return _backend
+
+
+def search_products(query, category_id=None, limit=SEARCH_LIMIT):
+    product_ids = get_search_backend().search(query, category_id, limit)
+    products = Products.objects.in_bulk(product_ids)
+    return [products[product_id] for product_id in product_ids if product_id in products]
+
+
+def suggest_product_names(query, limit=8):
+    return [product.name for product in search_products(query, limit=limit)]
+
+
+def index_products(products):
+    get_search_backend().index(products)
+
+
+def remove_products(product_ids):
+    get_search_backend().remove(product_ids)
+
+
+def rebuild_search_index():
+    get_search_backend().rebuild()
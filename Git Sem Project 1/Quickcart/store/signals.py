@@ -0,0 +1,85 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from store.models.product import Products, product_cache
+from store.models.category import Category, category_cache
+from store.models.orders import Order
+from store.catalog import bump_catalog_version
+from store import search
+from store import rollups
+from store.jobs import enqueue
+
+
+# The catalog version is bumped before the search index is touched, so the
+# in-process index records the version that already includes this change.
+# The bump also retires every object cache entry; invalidating here only
+# frees this process's copies early.
+
+@receiver(pre_save, sender=Products)
+def product_saving(sender, instance, raw=False, update_fields=None, **kwargs):
+    # the stored image name, to queue thumbnails only for a new image
+    instance._previous_image = None
+    if instance.pk and not raw and (update_fields is None or 'image' in update_fields):
+        instance._previous_image = Products.objects.filter(pk=instance.pk) \
+            .values_list('image', flat=True).first()
+    elif instance.pk:
+        instance._previous_image = instance.image.name
+
+
+@receiver(post_save, sender=Products)
+def product_saved(sender, instance, raw=False, **kwargs):
+    bump_catalog_version()
+    product_cache.invalidate([instance.pk])
+    if not raw:
+        search.index_products([instance])
+        if instance.image and instance.image.name != getattr(instance, '_previous_image', None):
+            enqueue('generate_thumbnails', {'name': instance.image.name})
+
+
+@receiver(post_delete, sender=Products)
+def product_deleted(sender, instance, **kwargs):
+    bump_catalog_version()
+    product_cache.invalidate([instance.pk])
+    search.remove_products([instance.id])
+
+
+@receiver(post_save, sender=Category)
+def category_saved(sender, instance, created=False, raw=False, **kwargs):
+    bump_catalog_version()
+    category_cache.invalidate()
+    if not raw and not created:
+        # the category name is indexed with each of its products
+        search.index_products(instance.products_set.select_related('category'))
+
+
+@receiver(post_delete, sender=Category)
+def category_deleted(sender, **kwargs):
+    bump_catalog_version()
+    category_cache.invalidate()
+
+
+# Orders saved one at a time (admin, placeOrder) keep the sales rollups
+# current here; bulk inserts and bulk status updates call store.rollups
+# themselves.
+
+@receiver(pre_save, sender=Order)
+def order_saving(sender, instance, raw=False, **kwargs):
+    instance._previous_status = None
+    if instance.pk and not raw:
+        instance._previous_status = Order.objects.filter(pk=instance.pk) \
+            .values_list('status', flat=True).first()
+
+
+@receiver(post_save, sender=Order)
+def order_saved(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        rollups.record_orders([instance])
+    elif instance._previous_status is not None and instance._previous_status != instance.status:
+        rollups.record_status_change([instance], instance.status)
+
+
+@receiver(post_delete, sender=Order)
+def order_deleted(sender, instance, **kwargs):
+    rollups.remove_orders([instance])
@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+
+# Applied to every new SQLite connection. busy_timeout makes a writer wait
+# for the lock instead of failing with "database is locked", and the
+# cache/mmap sizes keep the hot pages of a small store's database in memory.
+# busy_timeout comes first so the journal mode switch itself waits for the
+# lock too.
+DEFAULT_PRAGMAS = {
+    'busy_timeout': 5000,
+    'cache_size': -64000,
+    'mmap_size': 268435456,
+    'temp_store': 'MEMORY',
+}
+# With SQLITE_WAL. WAL lets readers carry on while a checkout writes, and
+# synchronous=NORMAL is durable under WAL except for the last commits on
+# power loss. The journal mode is stored in the database file and WAL keeps
+# -wal/-shm files beside it, so it is opt-in rather than switched on for
+# whatever database a checkout happens to point at.
+WAL_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+}
+
+
+def get_pragmas(wal=None):
+    wal = getattr(settings, 'SQLITE_WAL', False) if wal is None else wal
+    return {**DEFAULT_PRAGMAS, **(WAL_PRAGMAS if wal else {}), **getattr(settings, 'SQLITE_PRAGMAS', {})}
+
+
+def apply_pragmas(cursor, pragmas=None):
+    for name, value in (get_pragmas() if pragmas is None else pragmas).items():
+        cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def configure_connection(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        apply_pragmas(cursor)
+
+
+def install():
+    connection_created.connect(configure_connection, dispatch_uid='store.sqlite.configure_connection')
@@ -0,0 +1,85 @@
+// Progressive enhancement for the +/-/Add To Cart forms on the product grid.
+// Clicks update the card at once and are batched into a single request to
+// /cart/update; without JavaScript the forms post to / as before.
+(function () {
+  var grid = document.getElementById('products');
+  if (!grid || !window.fetch) { return; }
+
+  var endpoint = grid.getAttribute('data-cart-update-url');
+  var csrfInput = grid.querySelector('input[name=csrfmiddlewaretoken]');
+  var csrfToken = csrfInput ? csrfInput.value : '';
+  var pending = {};
+  var timer = null;
+  var inFlight = false;
+
+  function footerHtml(productId, quantity) {
+    var csrf = '<input type="hidden" name="csrfmiddlewaretoken" value="' + csrfToken + '">';
+    var product = '<input hidden type="text" name="product" value="' + productId + '">';
+    if (quantity <= 0) {
+      return '<form action="/#' + productId + '" method="POST" class="btn-block">' + csrf + product +
+        '<input type="submit" class="float-right btn btn-success form-control" value="Add To Cart"></form>';
+    }
+    return '<div class="row no-gutters">' +
+      '<form action="/#' + productId + '" class="col-2 " method="post">' + csrf + product +
+      '<input hidden type="text" name="remove" value="True">' +
+      '<input type="submit" value=" - " class="btn btn-block btn-success border-right"></form>' +
+      '<div class="text-center col btn btn-success" data-quantity="' + quantity + '">' + quantity + ' in Cart</div>' +
+      '<form action="/#' + productId + '" class="col-2 " method="post">' + csrf + product +
+      '<input type="submit" value=" + " class="btn btn-block btn-success border-left"></form>' +
+      '</div>';
+  }
+
+  function currentQuantity(card) {
+    var shown = card.querySelector('[data-quantity]');
+    return shown ? parseInt(shown.getAttribute('data-quantity'), 10) : 0;
+  }
+
+  function render(productId, quantity) {
+    var card = document.getElementById(productId);
+    if (card) {
+      card.querySelector('.card-footer').innerHTML = footerHtml(productId, quantity);
+    }
+  }
+
+  function flush() {
+    timer = null;
+    // one request at a time, so a cookie-backed cart never races itself
+    if (inFlight || !Object.keys(pending).length) { return; }
+    var changes = pending;
+    pending = {};
+    inFlight = true;
+    fetch(endpoint, {
+      method: 'POST',
+      credentials: 'same-origin',
+      headers: {'Content-Type': 'application/json', 'X-CSRFToken': csrfToken},
+      body: JSON.stringify({changes: changes})
+    }).then(function (response) {
+      if (!response.ok) { throw new Error(response.status); }
+      return response.json();
+    }).then(function (data) {
+      Object.keys(data.lines).forEach(function (productId) {
+        if (!pending[productId]) { render(productId, data.lines[productId]); }
+      });
+      var badge = document.getElementById('cart-count');
+      if (badge) { badge.textContent = data.count; }
+      inFlight = false;
+      if (Object.keys(pending).length && !timer) { flush(); }
+    }).catch(function () {
+      window.location.reload();
+    });
+  }
+
+  grid.addEventListener('submit', function (event) {
+    var form = event.target;
+    var product = form.querySelector('input[name=product]');
+    if (!product) { return; }
+    event.preventDefault();
+    var productId = product.value;
+    var delta = form.querySelector('input[name=remove]') ? -1 : 1;
+    var card = document.getElementById(productId);
+    render(productId, Math.max(0, currentQuantity(card) + delta));
+    pending[productId] = (pending[productId] || 0) + delta;
+    clearTimeout(timer);
+    timer = setTimeout(flush, 250);
+  });
+})();
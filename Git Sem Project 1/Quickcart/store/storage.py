@@ -0,0 +1,78 @@
+import gzip
+import hashlib
+import os
+
+from django.contrib.staticfiles.storage import StaticFilesStorage
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+
+try:
+    import brotli
+except ImportError:  # optional: only gzip variants are written without it
+    brotli = None
+
+# /media/<HASHED_PREFIX>/<digest>/<name> is served with far-future caching
+HASHED_PREFIX = '_h'
+DIGEST_LENGTH = 12
+
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.svg', '.html', '.txt', '.json', '.map', '.xml')
+MIN_COMPRESS_SIZE = 256
+
+
+def file_digest(path, stat=None):
+    """Short content hash of the file at ``path``, cached by size and mtime."""
+    stat = stat or os.stat(path)
+    signature = f'{path}:{stat.st_size}:{stat.st_mtime_ns}'
+    key = 'media:digest:' + hashlib.md5(signature.encode()).hexdigest()
+    digest = cache.get(key)
+    if digest is None:
+        hasher = hashlib.md5()
+        with open(path, 'rb') as handle:
+            for chunk in iter(lambda: handle.read(64 * 1024), b''):
+                hasher.update(chunk)
+        digest = hasher.hexdigest()[:DIGEST_LENGTH]
+        cache.set(key, digest, None)
+    return digest
+
+
+class HashedMediaStorage(FileSystemStorage):
+    """Media storage whose URLs carry a hash of the file's content.
+
+    A replaced image gets a new URL, so the old one can be cached by browsers
+    and proxies forever; see store.views.media.
+    """
+
+    def url(self, name):
+        try:
+            digest = file_digest(self.path(name))
+        except (OSError, ValueError):
+            return super().url(name)
+        return super().url(f'{HASHED_PREFIX}/{digest}/{name}')
+
+
+class CompressedStaticFilesStorage(StaticFilesStorage):
+    """Writes .gz (and .br when brotli is installed) next to text assets
+    during collectstatic, for the web server to send as-is
+    (nginx: gzip_static / brotli_static)."""
+
+    def post_process(self, paths, dry_run=False, **options):
+        if dry_run:
+            return
+        for name in paths:
+            if not name.endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            with self.open(name) as handle:
+                content = handle.read()
+            if len(content) < MIN_COMPRESS_SIZE:
+                continue
+            variants = [('.gz', gzip.compress(content, compresslevel=9, mtime=0))]
+            if brotli is not None:
+                variants.append(('.br', brotli.compress(content)))
+            for extension, compressed in variants:
+                if len(compressed) >= len(content):
+                    continue
+                if self.exists(name + extension):
+                    self.delete(name + extension)
+                self._save(name + extension, ContentFile(compressed))
+            yield name, name, True
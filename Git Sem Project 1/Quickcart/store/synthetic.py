@@ -0,0 +1,151 @@
+import datetime
+import random
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from store.models.category import Category
+from store.models.customer import Customer
+from store.models.orders import Order
+from store.models.product import Products
+from store.models.stock import StockMovement
+from store.catalog import bump_catalog_version
+from store.rollups import rebuild_rollups
+from store.search import rebuild_search_index
+
+# products per scale; customers and orders are derived from it
+SCALES = {'1k': 1000, '100k': 100000, '1m': 1000000}
+
+SKU_PREFIX = 'SYN-'
+EMAIL_DOMAIN = 'synthetic.invalid'
+PASSWORD = 'synthetic-password'
+BATCH_SIZE = 5000
+
+ADJECTIVES = ['Classic', 'Slim', 'Rugged', 'Organic', 'Compact', 'Deluxe', 'Vintage', 'Smart',
+              'Wireless', 'Handmade', 'Portable', 'Premium', 'Everyday', 'Travel', 'Studio']
+NOUNS = ['Watch', 'Backpack', 'Kettle', 'Headphones', 'Lamp', 'Jacket', 'Notebook', 'Mug',
+         'Sneakers', 'Speaker', 'Wallet', 'Blender', 'Camera', 'Scarf', 'Desk', 'Bottle']
+DEPARTMENTS = ['Electronics', 'Home', 'Kitchen', 'Fashion', 'Sports', 'Books', 'Toys', 'Garden',
+               'Beauty', 'Office', 'Travel', 'Music']
+
+
+def plan(scale):
+    products = SCALES[scale]
+    return {
+        'categories': min(100, max(len(DEPARTMENTS), products // 10000)),
+        'products': products,
+        'customers': max(100, products // 10),
+        'orders': products * 2,
+    }
+
+
+def customer_email(number):
+    return f'customer{number:07d}@{EMAIL_DOMAIN}'
+
+
+def _batches(iterable, size=BATCH_SIZE):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class SyntheticData:
+    """Deterministic catalog, customers and orders for load tests.
+
+    The same ``scale``, ``seed`` and ``end`` date always produce the same
+    rows. Rows go in with bulk statements, so the search index, the sales
+    rollups and the catalog version are rebuilt once at the end.
+    """
+
+    def __init__(self, scale='1k', seed=1, end=None):
+        self.counts = plan(scale)
+        self.random = random.Random(seed)
+        self.end = end or datetime.date.today()
+
+    @staticmethod
+    def exists():
+        return Products.objects.filter(sku__startswith=SKU_PREFIX).exists() or \
+            Customer.objects.filter(email__endswith=f'@{EMAIL_DOMAIN}').exists()
+
+    def run(self):
+        with transaction.atomic():
+            categories = self.create_categories()
+            products = self.create_products(categories)
+            customers = self.create_customers()
+            self.create_orders(products, customers)
+        rebuild_search_index()
+        rebuild_rollups()
+        bump_catalog_version()
+        return self.counts
+
+    def create_categories(self):
+        names = [DEPARTMENTS[number % len(DEPARTMENTS)] +
+                 ('' if number < len(DEPARTMENTS) else f' {number // len(DEPARTMENTS) + 1}')
+                 for number in range(self.counts['categories'])]
+        existing = set(Category.objects.filter(name__in=names).values_list('name', flat=True))
+        Category.objects.bulk_create([Category(name=name) for name in names if name not in existing])
+        return list(Category.objects.filter(name__in=names).order_by('id').values_list('id', flat=True))
+
+    def _products(self, categories):
+        rng = self.random
+        for number in range(self.counts['products']):
+            name = f'{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {number}'
+            yield Products(sku=f'{SKU_PREFIX}{number:07d}',
+                           name=name,
+                           price=rng.randint(99, 99999) // 100 * 100 + 99,
+                           category_id=rng.choice(categories),
+                           description=f'{name}, synthetic product for load testing.',
+                           image=f'uploads/products/synthetic-{number % 50}.jpg',
+                           stock=rng.randint(100, 10000) if rng.random() < 0.8 else None)
+
+    def create_products(self, categories):
+        for batch in _batches(self._products(categories)):
+            Products.objects.bulk_create(batch)
+        # the ledger opens with the generated stock, so reconcile_stock agrees
+        opening = Products.objects.filter(sku__startswith=SKU_PREFIX, stock__gt=0).values_list('id', 'stock')
+        for batch in _batches(opening.iterator()):
+            StockMovement.objects.bulk_create([StockMovement(product_id=product_id, kind=StockMovement.OPENING,
+                                                             quantity=stock, reference='synthetic')
+                                               for product_id, stock in batch])
+        # bulk_create does not hand back primary keys on every backend
+        return list(Products.objects.filter(sku__startswith=SKU_PREFIX)
+                    .order_by('id').values_list('id', 'price'))
+
+    def _customers(self):
+        # one precomputed hash: hashing a million passwords would take hours
+        password = make_password(PASSWORD, salt='synthetic')
+        rng = self.random
+        for number in range(self.counts['customers']):
+            yield Customer(first_name=rng.choice(ADJECTIVES), last_name=rng.choice(NOUNS),
+                           phone=f'{rng.randint(0, 10 ** 10 - 1):010d}',
+                           email=customer_email(number), password=password)
+
+    def create_customers(self):
+        for batch in _batches(self._customers()):
+            Customer.objects.bulk_create(batch)
+        return list(Customer.objects.filter(email__endswith=f'@{EMAIL_DOMAIN}')
+                    .order_by('id').values_list('id', flat=True))
+
+    def _orders(self, products, customers):
+        rng = self.random
+        for number in range(self.counts['orders']):
+            # cubing skews sales towards the first products, like a real
+            # catalog's best sellers
+            product_id, price = products[int(len(products) * rng.random() ** 3)]
+            age = int(365 * rng.random() ** 2)
+            yield Order(product_id=product_id,
+                        customer_id=customers[rng.randrange(len(customers))],
+                        quantity=rng.choice((1, 1, 1, 2, 2, 3)),
+                        price=price,
+                        address=f'{rng.randint(1, 999)} Synthetic Street',
+                        phone=f'{rng.randint(0, 10 ** 10 - 1):010d}',
+                        date=self.end - datetime.timedelta(days=age),
+                        status=age > 7 and rng.random() < 0.9)
+
+    def create_orders(self, products, customers):
+        for batch in _batches(self._orders(products, customers)):
+            Order.objects.bulk_create(batch)
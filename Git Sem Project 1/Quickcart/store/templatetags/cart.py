@@ -1,24 +1,24 @@
 from django import template
 
+from store.cart import CartView
+
 register = template.Library ()
 
 
+def as_cart_view(cart):
+    if isinstance (cart, CartView):
+        return cart
+    return CartView (cart)
+
+
 @register.filter (name='is_in_cart')
 def is_in_cart(product, cart):
-    keys = cart.keys ()
-    for id in keys:
-        if int (id) == product.id:
-            return True
-    return False;
+    return product.id in as_cart_view (cart)
 
 
 @register.filter (name='cart_quantity')
 def cart_quantity(product, cart):
-    keys = cart.keys ()
-    for id in keys:
-        if int (id) == product.id:
-            return cart.get (id)
-    return 0;
+    return as_cart_view (cart).quantity (product.id)
 
 
 @register.filter (name='price_total')
@@ -28,8 +28,5 @@ def price_total(product, cart):
 
 @register.filter (name='total_cart_price')
 def total_cart_price(products, cart):
-    sum = 0;
-    for p in products:
-        sum += price_total (p, cart)
-
-    return sum
+    cart = as_cart_view (cart)
+    return sum (product.price * cart.quantity (product.id) for product in products)
@@ -0,0 +1,21 @@
+from django import template
+from django.utils.html import format_html
+
+from store.thumbnails import thumbnail_srcsets
+
+register = template.Library ()
+
+
+@register.simple_tag (name='product_image')
+def product_image(product, sizes='100vw', css_class='', style='', alt=''):
+    # a <picture> that lets the browser pick the smallest WebP/JPEG variant
+    # for the rendered width; the original is the fallback
+    image = product.image
+    srcsets = thumbnail_srcsets (image.name) if image else {}
+    if not srcsets:
+        return format_html ('<img class="{}" style="{}" src="{}" alt="{}">',
+                            css_class, style, image.url if image else '', alt)
+    return format_html (
+        '<picture><source type="image/webp" srcset="{}" sizes="{}">'
+        '<img class="{}" style="{}" src="{}" srcset="{}" sizes="{}" alt="{}" loading="lazy"></picture>',
+        srcsets['webp'], sizes, css_class, style, image.url, srcsets['jpg'], sizes, alt)
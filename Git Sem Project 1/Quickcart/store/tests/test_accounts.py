@@ -0,0 +1,89 @@
+import asyncio
+import time
+from unittest import mock
+
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.cache import cache
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from store.models.customer import Customer
+from store.passwords import HashingBusy
+from store.ratelimit import client_ip
+
+
+def slow_check_password(password, encoded):
+    time.sleep(0.5)
+    return check_password(password, encoded)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class LoginTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        Customer.objects.create(first_name='a', last_name='b', phone='1', email='a@example.com',
+                                password=make_password('secret'))
+
+    def log_in(self, password='secret', email='a@example.com', address='127.0.0.1'):
+        return self.client.post('/login', {'email': email, 'password': password}, REMOTE_ADDR=address)
+
+    async def test_slow_hash_does_not_hold_up_other_requests(self):
+        finished = []
+
+        async def request(name, response):
+            await response
+            finished.append(name)
+
+        with mock.patch('store.passwords.check_password', side_effect=slow_check_password):
+            await asyncio.gather(
+                request('login', self.async_client.post('/login', 'email=a%40example.com&password=secret',
+                                                        content_type='application/x-www-form-urlencoded')),
+                request('page', self.async_client.get('/login')))
+        self.assertEqual(finished, ['page', 'login'])
+
+    def test_correct_password_logs_in(self):
+        self.assertRedirects(self.log_in(), '/', fetch_redirect_response=False)
+        self.assertIn('customer', self.client.session)
+
+    def test_guessing_is_limited_per_account_and_address(self):
+        for _ in range(5):
+            self.assertEqual(self.log_in('wrong').status_code, 200)
+        self.assertEqual(self.log_in().status_code, 429)
+        # the account's owner, elsewhere, is not locked out
+        self.assertRedirects(self.log_in(address='10.0.0.2'), '/', fetch_redirect_response=False)
+
+    def test_flood_from_one_address_is_limited(self):
+        for number in range(20):
+            self.log_in(email=f'{number}@example.com')
+        self.assertEqual(self.log_in(email='other@example.com').status_code, 429)
+
+    def test_busy_hashing_pool_answers_503(self):
+        with mock.patch('store.views.login.check_password_async', side_effect=HashingBusy):
+            self.assertEqual(self.log_in().status_code, 503)
+
+
+class SignupTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_sign_ups_are_limited_per_address(self):
+        for _ in range(10):
+            response = self.client.post('/signup', {'email': 'x'})
+            self.assertNotContains(response, 'Too many sign ups')
+        self.assertContains(self.client.post('/signup', {'email': 'x'}), 'Too many sign ups')
+
+
+class ClientAddressTests(SimpleTestCase):
+
+    def request(self, forwarded, address='10.0.0.1'):
+        return RequestFactory().get('/', REMOTE_ADDR=address, HTTP_X_FORWARDED_FOR=forwarded)
+
+    def test_forwarded_header_is_ignored_from_untrusted_peers(self):
+        self.assertEqual(client_ip(self.request('1.2.3.4')), '10.0.0.1')
+
+    @override_settings(TRUSTED_PROXIES=['10.0.0.1', '10.0.0.9'])
+    def test_client_is_the_first_untrusted_hop_from_the_right(self):
+        self.assertEqual(client_ip(self.request('1.2.3.4')), '1.2.3.4')
+        self.assertEqual(client_ip(self.request('6.6.6.6, 1.2.3.4, 10.0.0.9')), '1.2.3.4')
+        self.assertEqual(client_ip(self.request('')), '10.0.0.1')
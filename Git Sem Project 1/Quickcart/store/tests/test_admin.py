@@ -0,0 +1,59 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from store.models.category import Category
+from store.models.customer import Customer
+from store.models.orders import Order
+from store.models.product import Products
+from store.pagination import EstimatedCountPaginator
+
+
+class ChangelistTests(TestCase):
+
+    def setUp(self):
+        self.category = Category.objects.create(name='c')
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'x'))
+        self.add_rows(5)
+
+    def add_rows(self, count):
+        start = Customer.objects.count()
+        for number in range(start, start + count):
+            product = Products.objects.create(name=f'p{number}', price=10, category=self.category,
+                                              image='p.jpg')
+            customer = Customer.objects.create(first_name='a', last_name=f'b{number}', phone='1',
+                                               email=f'c{number}@example.com', password='x')
+            Order.objects.create(product=product, customer=customer, price=10)
+
+    def queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        for url in ('/admin/store/order/', '/admin/store/customer/', '/admin/store/products/'):
+            with self.subTest(url=url):
+                before = self.queries(url)
+                self.add_rows(5)
+                self.assertEqual(self.queries(url), before)
+
+    def test_large_unfiltered_changelist_uses_the_estimate(self):
+        with mock.patch.object(EstimatedCountPaginator, 'threshold', 1):
+            response = self.client.get('/admin/store/order/')
+        self.assertEqual(response.context['cl'].result_count, Order.objects.order_by('-id').first().id)
+        self.assertFalse(response.context['cl'].show_full_result_count)
+
+    def test_filtered_changelist_counts_exactly(self):
+        Order.objects.filter(id=Order.objects.order_by('id').first().id).delete()
+        with mock.patch.object(EstimatedCountPaginator, 'threshold', 1):
+            response = self.client.get('/admin/store/order/', {'status__exact': '0'})
+        self.assertEqual(response.context['cl'].result_count, 4)
+
+    def test_customer_search_matches_exact_email(self):
+        response = self.client.get('/admin/store/customer/', {'q': 'c3@example.com'})
+        self.assertEqual([customer.email for customer in response.context['cl'].result_list],
+                         ['c3@example.com'])
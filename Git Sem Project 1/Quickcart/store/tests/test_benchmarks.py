@@ -0,0 +1,22 @@
+from django.test import TransactionTestCase
+
+from store.benchmarks import QUERY_BUDGETS, Benchmark
+from store.synthetic import SyntheticData
+
+
+class QueryBudgetTests(TransactionTestCase):
+    # the `benchmark` command's scenarios on a small seeded catalog; the
+    # first request of each runs on a cold cache, the others on a warm one.
+    # Not a TestCase: its wrapping transaction turns every atomic block's
+    # BEGIN into a SAVEPOINT and RELEASE, one query more than in production.
+
+    def setUp(self):
+        SyntheticData('1k', seed=1).run()
+
+    def test_every_scenario_stays_within_its_query_budget(self):
+        results = Benchmark(iterations=3).run()
+        self.assertEqual(set(results), set(QUERY_BUDGETS))
+        for name, timing in results.items():
+            with self.subTest(name):
+                self.assertLessEqual(max(timing.queries), QUERY_BUDGETS[name])
+                self.assertLessEqual(set(timing.statuses), {'200', '302'})
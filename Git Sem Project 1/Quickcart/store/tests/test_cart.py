@@ -0,0 +1,105 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.cache import cache
+from django.test import RequestFactory, SimpleTestCase, TestCase
+
+from store.cart import CacheCartStore, CartView, get_cart_store
+from store.models.category import Category
+from store.models.product import Products
+from store.templatetags.cart import cart_quantity, is_in_cart, price_total, total_cart_price
+
+
+class CacheCartStoreTests(SimpleTestCase):
+
+    def store(self, cart_id):
+        request = RequestFactory().get('/')
+        request.COOKIES[CacheCartStore.cookie_name] = cart_id
+        return CacheCartStore(request)
+
+    def test_concurrent_adds_of_different_products_keep_every_line(self):
+        cart_id = '0' * 31 + '1'
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda product_id: self.store(cart_id).add(product_id), range(1, 41)))
+        self.assertEqual(self.store(cart_id).items(), {product_id: 1 for product_id in range(1, 41)})
+
+    def test_removed_and_re_added_line_is_listed_once(self):
+        store = self.store('0' * 31 + '2')
+        store.add(7)
+        store.add(7, -1)
+        store.add(7)
+        store.add(8, 2)
+        self.assertEqual(store.items(), {7: 1, 8: 2})
+        store.clear()
+        self.assertEqual(store.items(), {})
+
+
+class CartUpdateTests(TestCase):
+
+    def setUp(self):
+        category = Category.objects.create(name='c')
+        self.product = Products.objects.create(name='p', price=10, category=category, image='p.jpg')
+
+    def update(self, changes):
+        return self.client.post('/cart/update', {'changes': changes}, content_type='application/json')
+
+    def test_unknown_product_is_rejected(self):
+        response = self.update({str(self.product.id + 100): 1})
+        self.assertEqual(response.status_code, 404)
+        response = self.update({str(self.product.id): 2})
+        self.assertEqual(response.json()['lines'], {str(self.product.id): 2})
+        self.assertEqual(response.json()['total'], 20)
+
+
+class CartViewTests(SimpleTestCase):
+
+    def test_quantities_are_keyed_by_int_and_bad_ids_dropped(self):
+        view = CartView({'7': 2, 8: 1, 'x': 5})
+        self.assertEqual(view.quantities, {7: 2, 8: 1})
+        self.assertIn(7, view)
+        self.assertNotIn('x', view)
+        self.assertEqual(view.quantity(8), 1)
+        self.assertEqual(view.quantity(9), 0)
+        self.assertEqual(view.count, 2)
+        self.assertFalse(CartView())
+
+    def test_bind_totals_only_products_in_the_cart(self):
+        first = Products(id=7, name='a', price=10)
+        second = Products(id=8, name='b', price=3)
+        other = Products(id=9, name='c', price=100)
+        view = CartView({7: 2, 8: 1}).bind([first, second, other])
+        self.assertEqual([(line.product.id, line.quantity, line.total) for line in view.lines],
+                         [(7, 2, 20), (8, 1, 3)])
+        self.assertEqual(view.total, 23)
+
+    def test_for_request_is_built_once_and_rebuilt_after_a_change(self):
+        request = RequestFactory().get('/')
+        view = CartView.for_request(request)
+        self.assertIs(CartView.for_request(request), view)
+        get_cart_store(request).add(7, 3)
+        changed = CartView.for_request(request)
+        self.assertIsNot(changed, view)
+        self.assertEqual(changed.quantity(7), 3)
+
+    def test_filters_accept_a_view_or_a_plain_cart(self):
+        product = Products(id=7, name='a', price=10)
+        for cart in ({'7': 2}, CartView({7: 2})):
+            self.assertTrue(is_in_cart(product, cart))
+            self.assertEqual(cart_quantity(product, cart), 2)
+            self.assertEqual(price_total(product, cart), 20)
+            self.assertEqual(total_cart_price([product], cart), 20)
+
+
+class StoreCartRenderingTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        category = Category.objects.create(name='c')
+        self.product = Products.objects.create(name='p', price=10, category=category, image='p.jpg')
+
+    def test_store_page_shows_cart_quantities(self):
+        self.client.post('/', {'product': self.product.id})
+        self.client.post('/', {'product': self.product.id})
+        response = self.client.get('/store')
+        self.assertContains(response, '2 in Cart')
+        self.client.post('/', {'product': self.product.id, 'remove': '1'})
+        self.assertContains(self.client.get('/store'), '1 in Cart')
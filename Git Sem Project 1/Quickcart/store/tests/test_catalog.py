@@ -0,0 +1,114 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from store.catalog import (Filters, _key, get_catalog_version, get_facet_counts, get_filters,
+                           get_product_cards, get_sidebar, store_url)
+from store.models.category import Category
+from store.models.product import Products
+from store.pagination import encode_cursor
+
+
+class ProductCardCacheTests(TestCase):
+
+    def setUp(self):
+        category = Category.objects.create(name='c')
+        self.products = [Products.objects.create(name=f'p{number}', price=10, category=category, image='p.jpg')
+                         for number in range(3)]
+
+    def test_invalid_cursor_is_served_and_cached_as_the_first_page(self):
+        for cursor in ['junk', '\x00' * 50, 'A' * 5000]:
+            page = get_product_cards(after=cursor)
+            self.assertEqual([card.id for card in page], [product.id for product in self.products])
+        self.assertIsNotNone(cache.get(_key('cards', 'all', 'id', 'any', 'first')))
+
+    def test_valid_cursor_is_keyed_on_its_values(self):
+        page = get_product_cards(after=encode_cursor([self.products[0].id]))
+        self.assertEqual([card.id for card in page], [product.id for product in self.products[1:]])
+        self.assertIsNotNone(cache.get(_key('cards', 'all', 'id', 'any', self.products[0].id)))
+
+
+class CatalogInvalidationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name='shoes')
+        self.product = Products.objects.create(name='boot', price=10, category=self.category, image='p.jpg')
+
+    def html(self, category_id=None):
+        return ''.join(card.html for card in get_product_cards(category_id))
+
+    def test_saving_a_product_retires_every_cached_page(self):
+        self.assertIn('boot', self.html())
+        self.assertIn('boot', self.html(self.category.id))
+        version = get_catalog_version()
+        # bulk updates send no signal, so the cached pages are still served
+        Products.objects.filter(id=self.product.id).update(name='sandal')
+        self.assertIn('boot', self.html())
+        self.product.name = 'clog'
+        self.product.save()
+        self.assertGreater(get_catalog_version(), version)
+        self.assertIn('clog', self.html())
+        self.assertIn('clog', self.html(self.category.id))
+
+    def test_category_changes_refresh_the_sidebar(self):
+        self.assertIn('shoes', get_sidebar())
+        self.category.name = 'boots'
+        self.category.save()
+        self.assertIn('boots', get_sidebar())
+        Category.objects.create(name='hats')
+        self.assertIn('hats', get_sidebar())
+
+    def test_deleting_a_product_removes_its_card(self):
+        get_product_cards()
+        self.product.delete()
+        self.assertEqual(list(get_product_cards()), [])
+
+
+class FacetTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.shoes = Category.objects.create(name='shoes')
+        self.shirts = Category.objects.create(name='shirts')
+        self.cheap = Products.objects.create(name='a', price=100, category=self.shoes, image='p.jpg')
+        self.cheaper = Products.objects.create(name='b', price=50, category=self.shoes, image='p.jpg')
+        self.mid = Products.objects.create(name='c', price=500, category=self.shoes, image='p.jpg')
+        self.dear = Products.objects.create(name='d', price=25000, category=self.shirts, image='p.jpg')
+
+    def test_filters_fall_back_to_the_default(self):
+        self.assertEqual(get_filters({'category': '3', 'price': '500-1000', 'sort': 'price_desc'}),
+                         Filters(3, 1, 'price_desc'))
+        self.assertEqual(get_filters({'category': 'x', 'price': 'cheap', 'sort': 'name'}),
+                         Filters(None, None, 'id'))
+
+    def test_store_url_round_trips_the_filters(self):
+        self.assertEqual(store_url(Filters(None, None, 'id')), '/store')
+        self.assertEqual(store_url(Filters(3, 4, 'price')), '/store?category=3&price=over-20000&sort=price')
+
+    def test_counts_per_category_and_band(self):
+        self.assertEqual(get_facet_counts(), {(self.shoes.id, 0): 2, (self.shoes.id, 1): 1,
+                                              (self.shirts.id, 4): 1})
+        with self.assertNumQueries(0):
+            get_facet_counts()
+
+    def test_sidebar_counts_follow_the_other_filter(self):
+        with mock.patch('store.catalog.render_to_string', return_value='') as render:
+            get_sidebar(Filters(self.shoes.id, None, 'id'))
+            get_sidebar(Filters(None, 0, 'id'))
+        by_category, by_band = [call.args[1] for call in render.call_args_list]
+        self.assertEqual([band['count'] for band in by_category['bands']], [2, 1, 0, 0, 0])
+        self.assertEqual(by_category['any_price_count'], 3)
+        self.assertEqual(by_category['all_count'], 4)
+        self.assertEqual({category['name']: category['count'] for category in by_band['categories']},
+                         {'shoes': 2, 'shirts': 0})
+        self.assertEqual(by_band['all_count'], 2)
+
+    def test_store_page_filters_and_sorts_the_cards(self):
+        response = self.client.get('/store', {'category': self.shoes.id, 'price': 'under-500',
+                                              'sort': 'price'})
+        self.assertEqual([card.id for card in response.context['products']], [self.cheaper.id, self.cheap.id])
+        response = self.client.get('/store', {'sort': 'price_desc'})
+        self.assertEqual([card.id for card in response.context['products']],
+                         [self.dear.id, self.mid.id, self.cheap.id, self.cheaper.id])
@@ -0,0 +1,72 @@
+import io
+import os
+import shutil
+import tempfile
+
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from PIL import Image
+
+from store.catalog_io import CatalogImporter, read_rows
+from store.models.job import Job
+from store.models.product import Products
+from store.thumbnails import thumbnail_name
+
+
+class CatalogImportTests(TestCase):
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        media_root = override_settings(MEDIA_ROOT=media)
+        media_root.enable()
+        self.addCleanup(media_root.disable)
+
+    def import_rows(self, text, fmt='csv', images=None):
+        return CatalogImporter(images_dir=images, workers=2).run(read_rows(io.StringIO(text), fmt))
+
+    def test_bad_jsonl_lines_are_reported_by_line_number(self):
+        importer = self.import_rows('{"sku": "a", "name": "p", "category": "c"}\n'
+                                    '\n'
+                                    '{"sku": "b", "name": \n'
+                                    '["not", "an", "object"]\n'
+                                    '{"sku": "c", "name": "q", "category": "c"}\n', 'jsonl')
+        self.assertEqual(importer.created, 2)
+        self.assertEqual([error.split(':')[0] for error in importer.errors], ['row 3', 'row 4'])
+
+    def test_csv_rows_are_numbered_by_file_line(self):
+        importer = self.import_rows('sku,name,category,price\n'
+                                    'a,p,c,10\n'
+                                    'b,"two\nlines",c,x\n')
+        self.assertEqual([error.split(':')[0] for error in importer.errors], ['row 4'])
+
+    def test_new_images_without_image_files_queue_thumbnails(self):
+        self.import_rows('sku,name,category,image\na,p,c,a.jpg\nb,q,c,\n')
+        self.import_rows('sku,name,category,image\na,p,c,a.jpg\n')
+        self.assertEqual(list(Job.objects.filter(name='generate_thumbnails').values_list('payload', flat=True)),
+                         [{'name': 'uploads/products/a.jpg'}])
+
+    def write_image(self, directory, colour):
+        Image.new('RGB', (400, 200), colour).save(os.path.join(directory, 'a.jpg'), 'JPEG')
+
+    def thumbnail_colour(self):
+        with default_storage.open(thumbnail_name('uploads/products/a.jpg', 160, 'jpg'), 'rb') as handle:
+            return Image.open(handle).convert('RGB').getpixel((80, 40))
+
+    def test_replaced_image_file_gets_new_thumbnails(self):
+        images = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, images)
+        self.write_image(images, 'red')
+        path = os.path.join(images, 'catalog.csv')
+        with open(path, 'w') as handle:
+            handle.write('sku,name,category,image\na,p,c,a.jpg\n')
+        call_command('import_catalog', path, images=images, stdout=io.StringIO())
+        self.assertGreater(self.thumbnail_colour()[0], 200)
+        # same name and, for JPEGs of one flat colour, much the same size
+        self.write_image(images, 'blue')
+        self.import_rows('sku,name,category,image\na,p,c,a.jpg\n', images=images)
+        self.assertGreater(self.thumbnail_colour()[2], 200)
+        self.assertEqual(Products.objects.get(sku='a').image.name, 'uploads/products/a.jpg')
+        self.assertFalse(Job.objects.filter(name='generate_thumbnails').exists())
@@ -0,0 +1,80 @@
+from unittest import mock
+
+from django.db import IntegrityError
+from django.test import Client, TestCase
+
+from store.models.category import Category
+from store.models.checkout import CheckoutToken
+from store.models.customer import Customer
+from store.models.orders import Order
+from store.models.product import Products
+from store.models.stock import StockMovement
+
+
+class CheckoutTests(TestCase):
+
+    def setUp(self):
+        category = Category.objects.create(name='c')
+        self.product = Products.objects.create(name='p', price=10, category=category, image='p.jpg')
+        self.customer = Customer.objects.create(first_name='a', last_name='b', phone='1',
+                                                email='a@example.com', password='x')
+        session = self.client.session
+        session['customer'] = self.customer.id
+        session.save()
+
+    def add_to_cart(self, product, times=1):
+        for _ in range(times):
+            self.client.post('/', {'product': product.id})
+
+    def check_out(self, token='token-1'):
+        return self.client.post('/check-out', {'address': 'a', 'phone': '1', 'checkout_token': token})
+
+    def test_replayed_token_places_no_second_order(self):
+        self.add_to_cart(self.product, 2)
+        self.check_out()
+        self.add_to_cart(self.product, 2)
+        response = self.check_out()
+        self.assertRedirects(response, '/cart', fetch_redirect_response=False)
+        self.assertEqual(list(Order.objects.values_list('quantity', flat=True)), [2])
+
+    def test_other_integrity_errors_are_not_taken_for_a_replay(self):
+        self.add_to_cart(self.product)
+        with mock.patch.object(Order.objects, 'bulk_create', side_effect=IntegrityError('broken')):
+            with self.assertRaises(IntegrityError):
+                self.check_out()
+        self.assertFalse(CheckoutToken.is_claimed('token-1'))
+
+    def test_over_quantity_checkout_places_nothing(self):
+        StockMovement.set_levels({self.product.id: 2})
+        self.add_to_cart(self.product, 3)
+        self.check_out()
+        self.assertFalse(Order.objects.exists())
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 2)
+
+    def test_two_carts_cannot_both_buy_the_last_unit(self):
+        StockMovement.set_levels({self.product.id: 1})
+        other = Client()
+        session = other.session
+        session['customer'] = self.customer.id
+        session.save()
+        # both carts are filled before either checks out, as in a race
+        self.add_to_cart(self.product)
+        other.post('/', {'product': self.product.id})
+        self.check_out('token-1')
+        other.post('/check-out', {'address': 'a', 'phone': '1', 'checkout_token': 'token-2'})
+        self.assertEqual(Order.objects.count(), 1)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 0)
+        self.assertEqual(StockMovement.balances(), {self.product.id: 0})
+
+    def test_deleted_product_is_removed_and_nothing_is_ordered(self):
+        other = Products.objects.create(name='q', price=5, category=self.product.category, image='p.jpg')
+        self.add_to_cart(self.product)
+        self.add_to_cart(other)
+        other.delete()
+        self.check_out()
+        self.assertFalse(Order.objects.exists())
+        self.assertFalse(CheckoutToken.is_claimed('token-1'))
+        self.check_out('token-2')
+        self.assertEqual(list(Order.objects.values_list('product_id', flat=True)), [self.product.id])
@@ -0,0 +1,68 @@
+import datetime
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+
+from store import jobs
+from store.dashboard import months_back
+from store.jobs import claim_jobs, enqueue, record_sales, run_job, sales_lines
+from store.models.category import Category
+from store.models.customer import Customer
+from store.models.job import Job
+from store.models.orders import Order
+from store.models.product import Products
+from store.models.sales import DailySales, MonthlySales
+from store.rollups import rebuild_rollups
+
+
+class DashboardTests(SimpleTestCase):
+
+    def test_months_back_steps_by_calendar_month(self):
+        self.assertEqual(months_back(datetime.date(2024, 3, 31), 11), datetime.date(2023, 4, 1))
+        self.assertEqual(months_back(datetime.date(2024, 1, 1), 1), datetime.date(2023, 12, 1))
+        self.assertEqual(months_back(datetime.date(2024, 12, 31), 0), datetime.date(2024, 12, 1))
+        for day in range(1, 32):
+            start = months_back(datetime.date(2024, 7, day), 11)
+            self.assertEqual(start, datetime.date(2023, 8, 1))
+
+
+class RollupRebuildTests(TestCase):
+
+    def setUp(self):
+        category = Category.objects.create(name='c')
+        self.product = Products.objects.create(name='p', price=10, category=category, image='p.jpg')
+        customer = Customer.objects.create(first_name='a', last_name='b', phone='1',
+                                           email='a@example.com', password='x')
+        Job.objects.all().delete()
+        # placed as checkout does: bulk inserted, the rollups left to a job
+        orders = [Order(product=self.product, customer=customer, price=10, quantity=3)]
+        Order.objects.bulk_create(orders)
+        enqueue('record_sales', {'lines': sales_lines(orders)})
+
+    def assertSold(self, quantity):
+        self.assertEqual(list(DailySales.objects.values_list('quantity', flat=True)), [quantity])
+        self.assertEqual(list(MonthlySales.objects.values_list('quantity', flat=True)), [quantity])
+
+    def test_rebuild_drops_queued_sales_jobs(self):
+        rebuild_rollups()
+        self.assertEqual(claim_jobs('worker'), [])
+        self.assertSold(3)
+
+    def test_sales_job_running_during_a_rebuild_is_rolled_back(self):
+        job, = claim_jobs('worker')
+        rebuild_rollups()
+        self.assertFalse(run_job(job.id))
+        self.assertSold(3)
+        self.assertFalse(Job.objects.exists())
+
+    def test_sales_job_taken_over_by_another_worker_rolls_back(self):
+        job, = claim_jobs('worker')
+
+        def taken_over(lines):
+            record_sales(lines)
+            # requeued as stale and claimed again while this run is going
+            Job.objects.filter(id=job.id).update(locked_by='other')
+
+        with mock.patch.dict(jobs._handlers, {'record_sales': taken_over}):
+            self.assertFalse(run_job(job.id))
+        self.assertFalse(DailySales.objects.exists())
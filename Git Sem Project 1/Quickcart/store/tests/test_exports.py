@@ -0,0 +1,24 @@
+from django.test import TestCase
+
+from store.exports import stream_orders_csv
+from store.models.category import Category
+from store.models.customer import Customer
+from store.models.orders import Order
+from store.models.product import Products
+
+
+class OrderExportTests(TestCase):
+
+    def test_formula_cells_are_quoted(self):
+        category = Category.objects.create(name='c')
+        product = Products.objects.create(name='p', price=10, category=category, image='p.jpg')
+        customer = Customer.objects.create(first_name='=HYPERLINK("x")', last_name='b', phone='+123',
+                                           email='a@example.com', password='x')
+        Order.objects.create(product=product, customer=customer, price=-5, address='@home', phone='+123')
+        response = stream_orders_csv(Order.objects.all())
+        row = b''.join(response.streaming_content).decode().splitlines()[1]
+        self.assertIn("'=HYPERLINK", row)
+        self.assertIn("'@home", row)
+        self.assertIn(",'+123", row)
+        # numbers are data, not formulas
+        self.assertIn(',-5,', row)
@@ -0,0 +1,73 @@
+import shutil
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+
+from store.models.category import Category
+from store.models.product import Products
+
+
+class StorePageValidatorTests(TestCase):
+
+    def setUp(self):
+        category = Category.objects.create(name='c')
+        self.product = Products.objects.create(name='p', price=10, category=category, image='p.jpg')
+        # the first visit sets the CSRF cookie the cached forms rely on
+        self.client.get('/store')
+
+    def test_revisit_is_not_modified_until_the_cart_changes(self):
+        response = self.client.get('/store')
+        self.assertNotIn('Last-Modified', response)
+        etag = response['ETag']
+        self.assertEqual(self.client.get('/store', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.client.post('/', {'product': self.product.id})
+        response = self.client.get('/store', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_does_not_change_with_the_csrf_cookie_value(self):
+        etag = self.client.get('/store')['ETag']
+        self.client.cookies['csrftoken'] = 'x' * 64
+        self.assertEqual(self.client.get('/store')['ETag'], etag)
+
+    def test_no_validator_before_the_csrf_cookie_is_set(self):
+        self.client.cookies.clear()
+        self.assertNotIn('ETag', self.client.get('/store'))
+
+
+class MediaTests(TestCase):
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        media_root = override_settings(MEDIA_ROOT=media)
+        media_root.enable()
+        self.addCleanup(media_root.disable)
+        self.name = default_storage.save('uploads/products/a.txt', ContentFile(b'0123456789'))
+        self.url = f'/media/{self.name}'
+
+    def test_etag_and_last_modified_answer_304(self):
+        response = self.client.get(self.url)
+        self.assertEqual(b''.join(response.streaming_content), b'0123456789')
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code,
+                         304)
+
+    def test_byte_ranges(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=2-4')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 2-4/10')
+        self.assertEqual(b''.join(response.streaming_content), b'234')
+        self.assertEqual(b''.join(self.client.get(self.url, HTTP_RANGE='bytes=-3').streaming_content), b'789')
+        self.assertEqual(self.client.get(self.url, HTTP_RANGE='bytes=20-').status_code, 416)
+
+    def test_stale_if_range_gets_the_whole_file(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=2-4', HTTP_IF_RANGE='"old"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_hashed_url_is_immutable_only_for_the_current_content(self):
+        digest = self.client.get(self.url)['ETag'].strip('"')
+        self.assertIn('immutable', self.client.get(f'/media/_h/{digest}/{self.name}')['Cache-Control'])
+        self.assertNotIn('immutable', self.client.get(f'/media/_h/000000000000/{self.name}')['Cache-Control'])
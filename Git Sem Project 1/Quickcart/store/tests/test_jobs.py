@@ -0,0 +1,19 @@
+import io
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import close_old_connections
+from django.test import TransactionTestCase
+
+from store import jobs
+from store.models.job import Job
+
+
+class RunWorkersTests(TransactionTestCase):
+
+    def test_thread_workers_refresh_connections_around_each_job(self):
+        jobs.enqueue_many([('record_sales', {'lines': []})] * 3)
+        with mock.patch('store.jobs.close_old_connections', wraps=close_old_connections) as close:
+            call_command('run_workers', once=True, workers=2, stdout=io.StringIO())
+        self.assertEqual(close.call_count, 6)
+        self.assertEqual(set(Job.objects.values_list('status', flat=True)), {Job.DONE})
@@ -0,0 +1,47 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from store import metrics
+from store.models.category import Category
+
+
+class MetricsAccessTests(TestCase):
+
+    def test_loopback_address_alone_is_refused(self):
+        self.assertEqual(self.client.get('/metrics', REMOTE_ADDR='127.0.0.1').status_code, 403)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_bearer_token_is_required(self):
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret').status_code, 200)
+
+
+class RequestMetricsTests(TestCase):
+
+    def test_queries_on_another_threads_connection_are_counted(self):
+        def query():
+            try:
+                return list(Category.objects.all())
+            finally:
+                connection.close()
+
+        token = metrics.begin_request()
+        try:
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                pool.submit(contextvars.copy_context().run, query).result()
+        finally:
+            tallies = metrics.end_request(token)
+        self.assertEqual(tallies.queries, 1)
+
+    def test_views_record_sql_and_template_time(self):
+        # a catalog cached by an earlier test would leave nothing to query
+        cache.clear()
+        metrics.registry.sql.pop('store', None)
+        metrics.registry.templates.pop('store', None)
+        self.client.get('/store')
+        self.assertGreater(metrics.registry.sql['store'][0], 0)
+        self.assertGreater(metrics.registry.templates['store'], 0)
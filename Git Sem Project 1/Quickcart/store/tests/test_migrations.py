@@ -0,0 +1,40 @@
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+
+from store.models.category import Category
+from store.models.customer import Customer
+from store.models.orders import Order
+from store.models.product import Products
+
+
+class NormalizeEmailsMigrationTests(TransactionTestCase):
+    before = [('store', '0010_products_fts')]
+    after = [('store', '0011_customer_email_unique')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        self.migrate(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+    def test_duplicates_are_merged_into_the_oldest_account(self):
+        apps = self.migrate(self.before)
+        Customer = apps.get_model('store', 'Customer')
+        Order = apps.get_model('store', 'Order')
+        Category = apps.get_model('store', 'Category')
+        Products = apps.get_model('store', 'Products')
+        product = Products.objects.create(name='p', price=1, category=Category.objects.create(name='c'))
+        customers = [Customer.objects.create(first_name='b', last_name='b', phone='1', email=email, password='x')
+                     for email in ['Bob@x.com', 'bob@x.com', 'bob@x.com', 'Ann@X.com']]
+        Order.objects.create(product=product, customer=customers[2], price=1)
+
+        apps = self.migrate(self.after)
+        Customer = apps.get_model('store', 'Customer')
+        Order = apps.get_model('store', 'Order')
+        self.assertEqual(sorted(Customer.objects.values_list('id', 'email')),
+                         [(customers[0].id, 'bob@x.com'), (customers[3].id, 'ann@x.com')])
+        self.assertEqual(list(Order.objects.values_list('customer_id', flat=True)), [customers[0].id])
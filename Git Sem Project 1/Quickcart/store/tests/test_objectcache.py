@@ -0,0 +1,64 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from store.models.category import Category
+from store.models.product import Products
+from store.objectcache import ObjectCache
+
+
+class ObjectCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name='c')
+        self.products = [Products.objects.create(name=f'p{number}', price=10, category=self.category,
+                                                 image='p.jpg')
+                         for number in range(3)]
+        self.ids = [product.id for product in self.products]
+
+    def test_hits_need_no_queries(self):
+        objects = ObjectCache(Products)
+        self.assertEqual(set(objects.get_many(self.ids)), set(self.ids))
+        with self.assertNumQueries(0):
+            self.assertEqual(objects.get(self.ids[0]).name, 'p0')
+        # another process: empty LRU, same shared cache
+        with self.assertNumQueries(0):
+            self.assertEqual(set(ObjectCache(Products).get_many(self.ids)), set(self.ids))
+
+    def test_only_missing_ids_are_loaded(self):
+        objects = ObjectCache(Products)
+        objects.get(self.ids[0])
+        with CaptureQueriesContext(connection) as queries:
+            found = objects.get_many(self.ids + [self.ids[-1] + 100])
+        self.assertEqual(set(found), set(self.ids))
+        self.assertEqual(len(queries), 1)
+        loaded = queries[0]['sql'].rsplit('IN (', 1)[1].rstrip(')').split(', ')
+        self.assertEqual(sorted(map(int, loaded)), self.ids[1:] + [self.ids[-1] + 100])
+
+    def test_local_entries_are_bounded(self):
+        objects = ObjectCache(Products, max_local=2)
+        objects.get_many(self.ids)
+        self.assertEqual(len(objects.local), 2)
+        objects.get(self.ids[0])
+        self.assertEqual(list(objects.local)[-1], self.ids[0])
+
+    def test_save_and_delete_invalidate_through_the_version(self):
+        objects = ObjectCache(Products)
+        objects.get_many(self.ids)
+        self.products[0].name = 'renamed'
+        self.products[0].save()
+        self.products[1].delete()
+        found = objects.get_many(self.ids)
+        self.assertEqual(found[self.ids[0]].name, 'renamed')
+        self.assertNotIn(self.ids[1], found)
+
+    def test_all_is_cached_until_the_next_write(self):
+        objects = ObjectCache(Category)
+        self.assertEqual([category.name for category in objects.all()], ['c'])
+        with self.assertNumQueries(0):
+            objects.all()
+            ObjectCache(Category).all()
+        Category.objects.create(name='d')
+        self.assertEqual(sorted(category.name for category in objects.all()), ['c', 'd'])
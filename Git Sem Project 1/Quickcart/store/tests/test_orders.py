@@ -0,0 +1,41 @@
+import datetime
+
+from django.test import TestCase
+
+from store.models.category import Category
+from store.models.customer import Customer
+from store.models.orders import Order
+from store.models.product import Products
+from store.pagination import PAGE_SIZE
+
+
+class OrderHistoryTests(TestCase):
+
+    def setUp(self):
+        category = Category.objects.create(name='c')
+        products = [Products.objects.create(name=f'p{number}', price=10, category=category, image='p.jpg')
+                    for number in range(3)]
+        self.customer, other = [Customer.objects.create(first_name='a', last_name='b', phone='1',
+                                                        email=f'{number}@example.com', password='x')
+                                for number in range(2)]
+        start = datetime.date(2024, 1, 1)
+        # several orders a day, so pages must break ties on the id
+        self.orders = [Order.objects.create(customer=self.customer, product=products[number % 3], price=10,
+                                            quantity=2, date=start + datetime.timedelta(days=number // 4))
+                       for number in range(PAGE_SIZE + 6)]
+        Order.objects.create(customer=other, product=products[0], price=10, date=start)
+        session = self.client.session
+        session['customer'] = self.customer.id
+        session.save()
+
+    def test_pages_list_the_customers_orders_newest_first(self):
+        # the session and one query for the page, however many lines it shows
+        with self.assertNumQueries(2):
+            first = self.client.get('/orders')
+        second = self.client.get(first.context['next_url'])
+        shown = [order.id for order in first.context['orders']] + [order.id for order in second.context['orders']]
+        expected = [order.id for order in sorted(self.orders, key=lambda order: (order.date, order.id),
+                                                 reverse=True)]
+        self.assertEqual(shown, expected)
+        self.assertNotIn('next_url', second.context)
+        self.assertEqual({order.line_total for order in first.context['orders']}, {20})
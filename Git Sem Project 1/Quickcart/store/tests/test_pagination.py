@@ -0,0 +1,35 @@
+from django.test import TestCase
+
+from store.models.category import Category
+from store.models.product import Products
+from store.pagination import decode_cursor, encode_cursor, keyset_paginate
+
+
+class KeysetPaginationTests(TestCase):
+
+    def setUp(self):
+        category = Category.objects.create(name='c')
+        # repeated prices, so pages must break ties on the id
+        self.products = [Products.objects.create(name=f'p{number}', price=price, category=category, image='p.jpg')
+                         for number, price in enumerate([30, 10, 20, 10, 10, 30, 20])]
+
+    def walk(self, ordering, limit=2):
+        seen, cursor = [], None
+        while True:
+            page = keyset_paginate(Products.objects.all(), ordering, cursor, limit)
+            seen += [product.id for product in page]
+            if not page.has_next:
+                return seen
+            cursor = page.next_cursor
+
+    def test_pages_cover_every_row_once_in_order(self):
+        expected = [product.id for product in sorted(self.products, key=lambda product: (product.price, product.id))]
+        self.assertEqual(self.walk(('price', 'id')), expected)
+        self.assertEqual(self.walk(('-price', '-id')), expected[::-1])
+
+    def test_cursor_round_trip(self):
+        ordering = ('price', 'id')
+        cursor = encode_cursor([10, self.products[3].id])
+        self.assertEqual(decode_cursor(cursor, Products, ordering), [10, self.products[3].id])
+        self.assertIsNone(decode_cursor('not-a-cursor', Products, ordering))
+        self.assertIsNone(decode_cursor(encode_cursor([10]), Products, ordering))
@@ -0,0 +1,78 @@
+import datetime
+from unittest import mock
+
+from django.test import TestCase
+
+from store import recommendations
+from store.models.category import Category
+from store.models.customer import Customer
+from store.models.orders import Order
+from store.models.product import Products
+from store.models.recommendation import CoPurchase, Recommendation
+from store.recommendations import basket_arrays, rebuild_recommendations, refresh_recommendations
+
+DAY = datetime.date(2024, 5, 1)
+
+
+class RecommendationTests(TestCase):
+
+    def setUp(self):
+        category = Category.objects.create(name='c')
+        self.products = [Products.objects.create(name=f'p{number}', price=10, category=category, image='p.jpg')
+                         for number in range(4)]
+        self.customers = [Customer.objects.create(first_name='a', last_name='b', phone='1',
+                                                  email=f'{number}@example.com', password='x')
+                          for number in range(3)]
+
+    def order(self, customer, product, **fields):
+        return Order.objects.create(customer=self.customers[customer], product=self.products[product],
+                                    price=10, date=DAY, **fields)
+
+    def counts(self):
+        return dict(((product_id, other_id), count) for product_id, other_id, count
+                    in CoPurchase.objects.values_list('product_id', 'other_id', 'count'))
+
+    def rebuilt_counts(self):
+        rebuild_recommendations()
+        return self.counts()
+
+    def test_refresh_matches_a_full_rebuild(self):
+        self.order(0, 0)
+        self.order(0, 1)
+        rebuild_recommendations()
+        self.order(0, 2)
+        self.order(1, 0)
+        self.order(1, 2)
+        self.assertEqual(refresh_recommendations(), 3)
+        refreshed = self.counts()
+        self.assertEqual(refreshed, self.rebuilt_counts())
+        self.assertEqual(refreshed[(self.products[0].id, self.products[2].id)], 2)
+        self.assertEqual(list(Recommendation.for_products([self.products[1].id], 1)), [self.products[0].id])
+
+    def test_order_committed_after_a_higher_id_is_still_counted(self):
+        first = self.order(0, 0)
+        # ids are handed out in order, but the later one commits first
+        self.order(1, 2, id=first.id + 2)
+        refresh_recommendations()
+        self.order(0, 1, id=first.id + 1)
+        refresh_recommendations()
+        self.assertEqual(refresh_recommendations(), 0)
+        refreshed = self.counts()
+        self.assertEqual(refreshed[(self.products[0].id, self.products[1].id)], 1)
+        self.assertEqual(refreshed, self.rebuilt_counts())
+
+    def test_no_pair_is_stored_with_a_zero_count(self):
+        self.order(0, 0)
+        self.order(0, 1)
+        rebuild_recommendations()
+        CoPurchase.objects.filter(product=self.products[0], other=self.products[1]).update(count=0)
+        self.order(0, 3)
+        refresh_recommendations()
+        self.assertFalse(CoPurchase.objects.filter(count__lte=0).exists())
+
+    def test_basket_arrays_are_built_in_chunks(self):
+        lines = [(customer, DAY, product) for customer in range(3) for product in (3, 1, 2, 1)]
+        whole = basket_arrays(lines)
+        with mock.patch.object(recommendations, 'LINE_CHUNK', 2):
+            chunked = basket_arrays(iter(lines))
+        self.assertEqual([array.tolist() for array in chunked], [array.tolist() for array in whole])
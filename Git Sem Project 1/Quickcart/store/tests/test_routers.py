@@ -0,0 +1,110 @@
+import json
+import os
+import shutil
+import tempfile
+
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.db import connections
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+
+from store import routers
+from store.catalog import get_facet_counts, get_product_cards
+from store.models.category import Category
+from store.models.checkout import CheckoutToken
+from store.models.customer import Customer
+from store.models.orders import Order
+from store.models.product import Products, product_cache
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRouterTests(SimpleTestCase):
+
+    def setUp(self):
+        self.router = routers.PrimaryReplicaRouter()
+        self.token = routers.begin_request(pinned=False)
+
+    def tearDown(self):
+        routers.end_request(self.token)
+
+    def test_catalog_and_order_reads_go_to_a_replica(self):
+        for model in (Products, Category, Order):
+            self.assertEqual(self.router.db_for_read(model), 'replica')
+
+    def test_session_and_account_reads_stay_on_the_primary(self):
+        for model in (Session, Customer, CheckoutToken):
+            self.assertEqual(self.router.db_for_read(model), 'default')
+
+    def test_reads_after_a_write_stay_on_the_primary(self):
+        self.router.db_for_write(Order)
+        self.assertEqual(self.router.db_for_read(Products), 'default')
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class LaggingReplicaTests(TransactionTestCase):
+    # a real second database that misses the primary's latest writes. Not a
+    # TestCase: the router keeps every read inside a transaction on the
+    # primary. The replica is added after the test databases are set up, so
+    # tearDown empties it.
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.directory = tempfile.mkdtemp()
+        connections.databases['replica'] = dict(connections.databases['default'],
+                                                NAME=os.path.join(cls.directory, 'replica.sqlite3'))
+        connections['replica'].ensure_connection()
+        # the replica starts as a copy of the primary's schema
+        connections['default'].connection.backup(connections['replica'].connection)
+
+    @classmethod
+    def tearDownClass(cls):
+        connections['replica'].close()
+        del connections.databases['replica']
+        shutil.rmtree(cls.directory)
+        super().tearDownClass()
+
+    def tearDown(self):
+        Products.objects.using('replica').all().delete()
+        Category.objects.using('replica').all().delete()
+
+    def setUp(self):
+        cache.clear()
+        category = Category.objects.create(name='c')
+        self.product = Products.objects.create(name='p', price=10, category=category, image='p.jpg')
+        # the replica has the product at an old price and not the newest one
+        Category.objects.using('replica').create(id=category.id, name='c')
+        Products.objects.using('replica').create(id=self.product.id, name='p', price=99,
+                                                 category_id=category.id, image='p.jpg')
+        self.newest = Products.objects.create(name='new', price=20, category=category, image='p.jpg')
+        customer = Customer.objects.create(first_name='a', last_name='b', phone='1',
+                                           email='a@example.com', password='x')
+        session = self.client.session
+        session['customer'] = customer.id
+        session.save()
+
+    def update_cart(self, changes):
+        return self.client.post('/cart/update', json.dumps({'changes': changes}),
+                                content_type='application/json')
+
+    def test_reads_outside_the_caches_use_the_replica(self):
+        token = routers.begin_request(pinned=False)
+        try:
+            self.assertEqual(Products.objects.get(id=self.product.id).price, 99)
+        finally:
+            routers.end_request(token)
+
+    def test_cached_catalog_is_filled_from_the_primary(self):
+        response = self.client.get('/store')
+        self.assertContains(response, 'new')
+        self.assertEqual([card.price for card in get_product_cards()], [10, 20])
+        self.assertEqual(product_cache.get(self.product.id).price, 10)
+        self.assertEqual(sum(get_facet_counts().values()), 2)
+
+    def test_products_only_on_the_primary_can_be_added_and_bought_at_its_prices(self):
+        response = self.update_cart({str(self.product.id): 1, str(self.newest.id): 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['total'], 50)
+        self.client.post('/check-out', {'address': 'a', 'phone': '1', 'checkout_token': 'token-1'})
+        self.assertEqual(sorted(Order.objects.values_list('product_id', 'price', 'quantity')),
+                         [(self.product.id, 10, 1), (self.newest.id, 20, 2)])
@@ -0,0 +1,103 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from store import search
+from store.catalog import bump_catalog_version
+from store.models.category import Category
+from store.models.product import Products
+
+
+class SearchBackendTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.shoes = Category.objects.create(name='Shoes')
+        self.shirts = Category.objects.create(name='Shirts')
+        self.boot = Products.objects.create(name='Leather boot', price=10, category=self.shoes,
+                                            description='brown', image='p.jpg')
+        self.sneaker = Products.objects.create(name='Canvas sneaker', price=10, category=self.shoes,
+                                               description='leather trim', image='p.jpg')
+        self.shirt = Products.objects.create(name='Leather shirt', price=10, category=self.shirts,
+                                             image='p.jpg')
+
+    def backends(self):
+        inverted = search.InvertedIndexBackend()
+        inverted.rebuild()
+        return [search.FtsSearchBackend(), inverted]
+
+    def test_fts_is_used_on_sqlite(self):
+        self.assertTrue(search.fts_available())
+
+    def test_all_terms_must_match_and_name_hits_rank_first(self):
+        for backend in self.backends():
+            with self.subTest(backend=type(backend).__name__):
+                results = backend.search('leather')
+                self.assertEqual(set(results), {self.boot.id, self.sneaker.id, self.shirt.id})
+                self.assertEqual(results[-1], self.sneaker.id)
+                self.assertEqual(backend.search('leather boot'), [self.boot.id])
+                self.assertEqual(backend.search('leather velvet'), [])
+
+    def test_last_term_matches_as_a_prefix(self):
+        for backend in self.backends():
+            with self.subTest(backend=type(backend).__name__):
+                self.assertEqual(backend.search('sneak'), [self.sneaker.id])
+                self.assertEqual(backend.search('leather bo'), [self.boot.id])
+                self.assertEqual(backend.search('sneak canvas'), [])
+
+    def test_category_filter(self):
+        for backend in self.backends():
+            with self.subTest(backend=type(backend).__name__):
+                self.assertEqual(backend.search('leather', self.shirts.id), [self.shirt.id])
+                self.assertEqual(set(backend.search('shoes')), {self.boot.id, self.sneaker.id})
+
+    def test_index_follows_saves_and_deletes(self):
+        self.boot.name = 'Suede loafer'
+        self.boot.save()
+        self.shirt.delete()
+        for backend in self.backends():
+            with self.subTest(backend=type(backend).__name__):
+                self.assertEqual(backend.search('loafer'), [self.boot.id])
+                self.assertEqual(set(backend.search('leather')), {self.sneaker.id})
+
+    def test_fallback_rebuilds_after_another_process_changes_the_catalog(self):
+        backend = search.InvertedIndexBackend()
+        backend.rebuild()
+        # written behind this process's signals, as another worker would
+        Products.objects.filter(id=self.shirt.id).update(name='Linen shirt')
+        self.assertEqual(backend.search('linen'), [])
+        bump_catalog_version()
+        self.assertEqual(backend.search('linen'), [self.shirt.id])
+
+
+class SearchViewTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name='c')
+        self.products = [Products.objects.create(name=f'lamp {n}', price=10, category=self.category,
+                                                 image='p.jpg')
+                         for n in range(3)]
+
+    def test_results_and_limit_notice(self):
+        response = self.client.get('/search', {'q': 'lamp'})
+        self.assertEqual(len(response.context['products']), 3)
+        self.assertFalse(response.context['limited'])
+        with mock.patch('store.views.search.SEARCH_LIMIT', 3):
+            response = self.client.get('/search', {'q': 'lamp'})
+        self.assertTrue(response.context['limited'])
+        self.assertContains(response, 'refine your search')
+
+    def test_category_and_empty_query(self):
+        other = Category.objects.create(name='other')
+        response = self.client.get('/search', {'q': 'lamp', 'category': other.id})
+        self.assertEqual(response.context['products'], [])
+        response = self.client.get('/search', {'q': 'lamp', 'category': 'x'})
+        self.assertIsNone(response.context['category_id'])
+        self.assertEqual(self.client.get('/search').context['products'], [])
+
+    def test_suggest(self):
+        response = self.client.get('/search/suggest', {'q': 'la'})
+        self.assertEqual(sorted(response.json()['suggestions']), ['lamp 0', 'lamp 1', 'lamp 2'])
+        self.assertEqual(self.client.get('/search/suggest').json(), {'suggestions': []})
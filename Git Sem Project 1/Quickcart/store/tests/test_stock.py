@@ -0,0 +1,37 @@
+import io
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from store.models.category import Category
+from store.models.product import Products
+from store.models.stock import StockMovement
+
+
+class StockLedgerTests(TestCase):
+
+    def setUp(self):
+        category = Category.objects.create(name='c')
+        self.product = Products.objects.create(name='p', price=10, category=category, image='p.jpg',
+                                               reorder_level=5)
+        StockMovement.set_levels({self.product.id: 8})
+
+    def test_movements_update_balance_and_reorder_flag(self):
+        self.assertEqual(Products.reserve_stock({self.product.id: 4}), [])
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.stock, self.product.reorder_required), (4, True))
+        StockMovement.receive({self.product.id: 10})
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.stock, self.product.reorder_required), (14, False))
+        self.assertEqual(StockMovement.balances(), {self.product.id: 14})
+
+    def test_reconcile_reports_and_fixes_drift(self):
+        call_command('reconcile_stock', stdout=io.StringIO())
+        Products.objects.filter(id=self.product.id).update(stock=99, reorder_required=True)
+        with self.assertRaises(CommandError):
+            call_command('reconcile_stock', stdout=io.StringIO())
+        call_command('reconcile_stock', fix=True, stdout=io.StringIO())
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.stock, self.product.reorder_required), (8, False))
+        call_command('reconcile_stock', stdout=io.StringIO())
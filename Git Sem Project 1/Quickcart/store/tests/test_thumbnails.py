@@ -0,0 +1,72 @@
+import io
+import shutil
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from PIL import Image
+
+from store.catalog import get_catalog_version
+from store.jobs import make_thumbnails
+from store.thumbnails import generate_thumbnails, thumbnail_name
+from store.models.category import Category
+from store.models.job import Job
+from store.models.product import Products
+
+
+class ThumbnailTests(TestCase):
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        media_root = override_settings(MEDIA_ROOT=media)
+        media_root.enable()
+        self.addCleanup(media_root.disable)
+        self.category = Category.objects.create(name='c')
+
+    def upload(self, name, width):
+        buffer = io.BytesIO()
+        Image.new('RGB', (width, width // 2), 'red').save(buffer, 'JPEG')
+        return default_storage.save(name, ContentFile(buffer.getvalue()))
+
+    def test_saving_without_a_new_image_queues_nothing(self):
+        product = Products.objects.create(name='p', price=10, category=self.category,
+                                          image=self.upload('uploads/products/a.jpg', 400))
+        self.assertEqual(Job.objects.filter(name='generate_thumbnails').count(), 1)
+        product.price = 12
+        product.save()
+        self.assertEqual(Job.objects.filter(name='generate_thumbnails').count(), 1)
+        product.image = self.upload('uploads/products/b.jpg', 400)
+        product.save()
+        self.assertEqual(Job.objects.filter(name='generate_thumbnails').count(), 2)
+
+    def test_no_variant_is_as_wide_as_the_source(self):
+        name = self.upload('uploads/products/small.jpg', 120)
+        self.assertEqual(generate_thumbnails(name), [])
+        name = self.upload('uploads/products/medium.jpg', 320)
+        self.assertEqual(generate_thumbnails(name), [160])
+        with default_storage.open(thumbnail_name(name, 160, 'jpg')) as variant:
+            self.assertEqual(Image.open(variant).width, 160)
+        self.assertFalse(default_storage.exists(thumbnail_name(name, 320, 'jpg')))
+
+    def test_job_bumps_the_catalog_only_when_it_writes(self):
+        name = self.upload('uploads/products/c.jpg', 400)
+        version = get_catalog_version()
+        make_thumbnails(name)
+        self.assertNotEqual(get_catalog_version(), version)
+        version = get_catalog_version()
+        make_thumbnails(name)
+        self.assertEqual(get_catalog_version(), version)
+
+    def test_command_bumps_the_catalog_once_it_has_written(self):
+        Products.objects.create(name='p', price=10, category=self.category,
+                                image=self.upload('uploads/products/d.jpg', 400))
+        version = get_catalog_version()
+        call_command('generate_thumbnails', workers=1, stdout=io.StringIO())
+        self.assertTrue(default_storage.exists(thumbnail_name('uploads/products/d.jpg', 320, 'webp')))
+        self.assertEqual(get_catalog_version(), version + 1)
+        call_command('generate_thumbnails', workers=1, stdout=io.StringIO())
+        self.assertEqual(get_catalog_version(), version + 1)
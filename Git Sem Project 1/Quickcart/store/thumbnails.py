@@ -0,0 +1,105 @@
+import io
+import posixpath
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image
+
+# widths the card grid, cart and order pages pick from through srcset
+THUMBNAIL_WIDTHS = (160, 320, 640)
+THUMBNAIL_FORMATS = (
+    ('webp', 'WEBP', {'quality': 80, 'method': 4}),
+    ('jpg', 'JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+)
+THUMBNAIL_DIR = 'thumbs'
+
+
+def thumbnail_name(name, width, extension):
+    # uploads/products/watch.jpg -> uploads/products/thumbs/watch-320.webp
+    directory, filename = posixpath.split(name)
+    stem = posixpath.splitext(filename)[0]
+    return posixpath.join(directory, THUMBNAIL_DIR, f'{stem}-{width}.{extension}')
+
+
+def _cache_key(name):
+    return f'thumbs:{name}'
+
+
+def generate_thumbnails(name):
+    """Write every missing variant of the image ``name``; returns its widths.
+
+    Upload names are unique, so a variant that already exists is current and
+    is left alone. Widths at or above the original's are skipped, so every
+    srcset entry is labelled with its real width; the original itself is
+    the <img> fallback.
+    """
+    return write_thumbnails(name)[0]
+
+
+def write_thumbnails(name):
+    # (widths, number of variant files written); see generate_thumbnails
+    if not name or not default_storage.exists(name):
+        return [], 0
+    widths, written = [], 0
+    with default_storage.open(name, 'rb') as source:
+        original = Image.open(source)
+        original.load()
+    if original.mode not in ('RGB', 'L'):
+        original = original.convert('RGB')
+    for width in THUMBNAIL_WIDTHS:
+        targets = [(thumbnail_name(name, width, extension), image_format, options)
+                   for extension, image_format, options in THUMBNAIL_FORMATS]
+        if width >= original.width:
+            # drop variants an older version upscaled or mislabelled
+            for target, _, _ in targets:
+                if default_storage.exists(target):
+                    default_storage.delete(target)
+                    written += 1
+            continue
+        widths.append(width)
+        if all(default_storage.exists(target) for target, _, _ in targets):
+            continue
+        height = max(1, round(original.height * width / original.width))
+        resized = original.resize((width, height), Image.LANCZOS)
+        for target, image_format, options in targets:
+            buffer = io.BytesIO()
+            resized.save(buffer, image_format, **options)
+            if default_storage.exists(target):
+                default_storage.delete(target)
+            default_storage.save(target, ContentFile(buffer.getvalue()))
+            written += 1
+    remember_thumbnail_widths(name, widths)
+    return widths, written
+
+
+def delete_thumbnails(name):
+    # before an image is replaced under the same name
+    for width in THUMBNAIL_WIDTHS:
+        for extension, _, _ in THUMBNAIL_FORMATS:
+            target = thumbnail_name(name, width, extension)
+            if default_storage.exists(target):
+                default_storage.delete(target)
+    cache.delete(_cache_key(name))
+
+
+def remember_thumbnail_widths(name, widths):
+    cache.set(_cache_key(name), widths, None)
+
+
+def thumbnail_widths(name):
+    widths = cache.get(_cache_key(name))
+    if widths is None:
+        widths = [width for width in THUMBNAIL_WIDTHS
+                  if default_storage.exists(thumbnail_name(name, width, 'jpg'))]
+        # none yet may just mean the worker has not made them; look again soon
+        cache.set(_cache_key(name), widths, None if widths else 60)
+    return widths
+
+
+def thumbnail_srcsets(name):
+    # {'webp': 'url 160w, url 320w', 'jpg': ...}, or {} without thumbnails
+    widths = thumbnail_widths(name)
+    return {extension: ', '.join(f'{default_storage.url(thumbnail_name(name, width, extension))} {width}w'
+                                 for width in widths)
+            for extension, _, _ in THUMBNAIL_FORMATS} if widths else {}
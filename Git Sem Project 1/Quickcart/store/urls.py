@@ -3,21 +3,31 @@ from django.urls import path
 from .views.home import Index , store
 from .views.signup import Signup
 from .views.login import Login , logout
-from .views.cart import Cart
+from .views.cart import Cart , CartUpdate
 from .views.checkout import CheckOut
-from .views.orders import OrderView
+from .views.orders import OrderView , export_orders
+from .views.search import Search , suggest
+from .views.dashboard import dashboard , low_stock
+from .views.metrics import metrics
 from .middlewares.auth import  auth_middleware
 
 
 urlpatterns = [
     path('', Index.as_view(), name='homepage'),
     path('store', store , name='store'),
+    path('search', Search.as_view(), name='search'),
+    path('search/suggest', suggest , name='search-suggest'),
 
     path('signup', Signup.as_view(), name='signup'),
     path('login', Login.as_view(), name='login'),
     path('logout', logout , name='logout'),
     path('cart', auth_middleware(Cart.as_view()) , name='cart'),
+    path('cart/update', CartUpdate.as_view() , name='cart-update'),
     path('check-out', CheckOut.as_view() , name='checkout'),
     path('orders', auth_middleware(OrderView.as_view()), name='orders'),
+    path('orders/export', export_orders , name='orders-export'),
+    path('dashboard', dashboard , name='dashboard'),
+    path('dashboard/low-stock', low_stock , name='low-stock'),
+    path('metrics', metrics , name='metrics'),
 
 ]
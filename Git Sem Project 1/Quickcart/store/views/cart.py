@@ -1,14 +1,69 @@
 from django.shortcuts import render , redirect
+from django.http import JsonResponse
+import json
+import logging
+import uuid
 
-from django.contrib.auth.hashers import  check_password
-from store.models.customer import Customer
 from django.views import  View
+from store.cart import CartView, get_cart_store
 from store.models.product import Products
+from store.models.recommendation import Recommendation
+
+logger = logging.getLogger(__name__)
+
+# bounds on one /cart/update request
+MAX_CHANGES = 50
+MAX_DELTA = 99
 
 class Cart(View):
     def get(self , request):
-        ids = list(request.session.get('cart').keys())
-        products = Products.get_products_by_id(ids)
-        print(products)
-        return render(request , 'cart.html' , {'products' : products} )
+        cart = CartView.for_request(request)
+        products = Products.get_products_by_id(cart.product_ids())
+        cart.bind(products)
+        logger.debug('cart products %s', cart.product_ids())
+        # a fresh token per rendered form; CheckOut refuses to reuse one
+        checkout_token = uuid.uuid4().hex
+        return render(request , 'cart.html' , {'products' : products ,
+                                               'cart' : cart ,
+                                               'recommendations' : self.recommendations(cart),
+                                               'checkout_token' : checkout_token} )
+
+    def recommendations(self, cart, limit=4):
+        # one indexed lookup in the precomputed top-K table, then the cached products
+        product_ids = Recommendation.for_products(cart.product_ids(), limit)
+        products = {product.id: product for product in Products.get_products_by_id(product_ids)}
+        return [products[product_id] for product_id in product_ids if product_id in products]
+
+
+class CartUpdate(View):
+    # Applies {"changes": {"<product id>": delta, ...}} and answers with only
+    # the changed lines, the cart count and the total instead of a redirect
+    # and a full catalog render.
+
+    def post(self , request):
+        try:
+            changes = json.loads(request.body or b'{}').get('changes')
+            changes = {int(product_id): int(delta) for product_id, delta in changes.items()}
+        except (ValueError, TypeError, AttributeError):
+            return JsonResponse({'error': 'expected {"changes": {"<product id>": delta}}'}, status=400)
+        if not changes or len(changes) > MAX_CHANGES or \
+                any(abs(delta) > MAX_DELTA for delta in changes.values()):
+            return JsonResponse({'error': 'too many or too large changes'}, status=400)
+
+        # only real products can be added; removing an unknown id is harmless
+        # and lets a cart shed lines whose product was deleted
+        added = [product_id for product_id, delta in changes.items() if delta > 0]
+        known = {product.id for product in Products.get_products_by_id(added)}
+        unknown = sorted(set(added) - known)
+        if unknown:
+            return JsonResponse({'error': 'no such product', 'products': unknown}, status=404)
+
+        store = get_cart_store(request)
+        lines = {product_id: store.add(product_id, delta)
+                 for product_id, delta in changes.items() if delta}
 
+        cart = CartView.for_request(request)
+        cart.bind(Products.get_products_by_id(cart.product_ids()))
+        return JsonResponse({'lines': lines,
+                             'count': cart.count,
+                             'total': cart.total})
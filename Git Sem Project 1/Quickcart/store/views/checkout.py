@@ -1,31 +1,95 @@
 from django.shortcuts import render, redirect
+from django.contrib import messages
+from django.db import transaction, IntegrityError
 
-from django.contrib.auth.hashers import check_password
 from store.models.customer import Customer
 from django.views import View
+from store.cart import CartView, get_cart_store
 
 from store.models.product import Products
 from store.models.orders import Order
+from store.models.checkout import CheckoutToken
+from store.jobs import enqueue_many, sales_lines
+
+
+class OutOfStock(Exception):
+    def __init__(self, product_ids):
+        super().__init__(product_ids)
+        self.product_ids = product_ids
+
+
+class Unavailable(Exception):
+    def __init__(self, product_ids):
+        super().__init__(product_ids)
+        self.product_ids = product_ids
 
 
 class CheckOut(View):
     def post(self, request):
         address = request.POST.get('address')
         phone = request.POST.get('phone')
+        token = request.POST.get('checkout_token')
         customer = request.session.get('customer')
-        cart = request.session.get('cart')
-        products = Products.get_products_by_id(list(cart.keys()))
-        print(address, phone, customer, cart, products)
-
-        for product in products:
-            print(cart.get(str(product.id)))
-            order = Order(customer=Customer(id=customer),
-                          product=product,
-                          price=product.price,
-                          address=address,
-                          phone=phone,
-                          quantity=cart.get(str(product.id)))
-            order.save()
-        request.session['cart'] = {}
+        cart = CartView.for_request(request)
+        if not customer:
+            return redirect('login')
+        if not cart or not token:
+            return redirect('cart')
+
+        try:
+            with transaction.atomic():
+                CheckoutToken.claim(token, customer)
+                # prices come from the primary inside the transaction, not
+                # from the object cache or a replica, which may both lag
+                cart.bind(Products.objects.filter(id__in=cart.product_ids()).order_by('id'))
+                missing = set(cart.product_ids()) - {line.product.id for line in cart.lines}
+                if missing:
+                    raise Unavailable(sorted(missing))
+                orders = [Order(customer=Customer(id=customer),
+                                product=line.product,
+                                price=line.product.price,
+                                address=address,
+                                phone=phone,
+                                quantity=line.quantity)
+                          for line in cart.lines]
+                short = Products.reserve_stock({line.product.id: line.quantity for line in cart.lines},
+                                               reference=f'checkout:{token}')
+                if short:
+                    raise OutOfStock(short)
+                Order.objects.bulk_create(orders)
+                # rollups and the confirmation email are left to run_workers;
+                # the jobs commit with the orders or not at all
+                enqueue_many([
+                    ('record_sales', {'lines': sales_lines(orders)}),
+                    ('send_order_confirmation', {
+                        'customer_id': customer,
+                        'lines': [{'name': line.product.name, 'quantity': line.quantity, 'price': line.total}
+                                  for line in cart.lines],
+                        'total': cart.total}),
+                ])
+                transaction.on_commit(get_cart_store(request).clear)
+        except IntegrityError:
+            # only a token that is already claimed means this form has been
+            # submitted before; any other constraint failure is a real error
+            if not CheckoutToken.is_claimed(token):
+                raise
+        except OutOfStock as error:
+            # nothing was reserved or ordered; tell the shopper which lines to fix
+            self.report_short_lines(request, cart, error.product_ids)
+        except Unavailable as error:
+            # products deleted since they were added; drop them so the
+            # shopper can review the rest of the cart before ordering
+            store = get_cart_store(request)
+            for product_id in error.product_ids:
+                store.add(product_id, -cart.quantity(product_id))
+            messages.error(request, 'Some products in your cart are no longer sold and were removed. '
+                                    'Please check your cart and order again.')
 
         return redirect('cart')
+
+    def report_short_lines(self, request, cart, product_ids):
+        available = dict(Products.objects.filter(id__in=product_ids).values_list('id', 'stock'))
+        for line in cart.lines:
+            if line.product.id in available:
+                messages.error(request, f'Only {available[line.product.id]} of {line.product.name} '
+                                        f'left in stock, you asked for {line.quantity}.')
@@ -0,0 +1,16 @@
+from django.shortcuts import render
+from django.contrib.admin.views.decorators import staff_member_required
+
+from store.dashboard import get_dashboard_data
+from store.models.product import Products
+
+
+@staff_member_required
+def dashboard(request):
+    return render(request, 'dashboard.html', get_dashboard_data())
+
+
+@staff_member_required
+def low_stock(request):
+    # reads the indexed reorder flag, never the stock ledger
+    return render(request, 'low_stock.html', {'products': Products.get_low_stock()})
@@ -1,8 +1,18 @@
+import hashlib
+import logging
+
+from django.conf import settings
 from django.shortcuts import render , redirect , HttpResponseRedirect
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+from store.catalog import get_sidebar, get_product_cards, get_catalog_version, get_filters
+from store.pagination import page_url
+from store.cart import get_cart_store
 from store.models.product import Products
-from store.models.category import Category
 from django.views import View
 
+logger = logging.getLogger(__name__)
+
 
 # Create your views here.
 class Index(View):
@@ -10,51 +20,47 @@ class Index(View):
     def post(self , request):
         product = request.POST.get('product')
         remove = request.POST.get('remove')
-        cart = request.session.get('cart')
-        if cart:
-            quantity = cart.get(product)
-            if quantity:
-                if remove:
-                    if quantity<=1:
-                        cart.pop(product)
-                    else:
-                        cart[product]  = quantity-1
-                else:
-                    cart[product]  = quantity+1
-
-            else:
-                cart[product] = 1
-        else:
-            cart = {}
-            cart[product] = 1
-
-        request.session['cart'] = cart
-        print('cart' , request.session['cart'])
+        if product and product.isdigit() and (remove or Products.get_products_by_id([int(product)])):
+            cart = get_cart_store(request)
+            cart.add(int(product), -1 if remove else 1)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug('cart %s', cart.items())
         return redirect('homepage')
 
 
 
     def get(self , request):
-        # print()
         return HttpResponseRedirect(f'/store{request.get_full_path()[1:]}')
 
+def _store_etag(request):
+    # everything the page depends on besides the URL: the catalog, the cart
+    # buttons and the login links. The CSRF token in the forms only changes
+    # with the cookie, which is rotated at login (already part of the key),
+    # so until the browser has the cookie there is no validator at all.
+    if settings.CSRF_COOKIE_NAME not in request.COOKIES:
+        return None
+    state = [get_catalog_version(),
+             sorted(get_cart_store(request).items().items()),
+             request.session.get('customer'),
+             request.user.pk if request.user.is_staff else None]
+    return hashlib.md5(repr(state).encode()).hexdigest()
+
+
+# No Last-Modified: the page changes with the cart, which has no timestamp,
+# and a catalog-only date would answer If-Modified-Since with a stale cart.
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_store_etag)
 def store(request):
-    cart = request.session.get('cart')
-    if not cart:
-        request.session['cart'] = {}
-    products = None
-    categories = Category.get_all_categories()
-    categoryID = request.GET.get('category')
-    if categoryID:
-        products = Products.get_all_products_by_categoryid(categoryID)
-    else:
-        products = Products.get_all_products();
+    filters = get_filters(request.GET)
+
+    page = get_product_cards(filters.category, request.GET.get('after'), filters.sort, filters.band)
 
     data = {}
-    data['products'] = products
-    data['categories'] = categories
+    data['products'] = page
+    data['sidebar'] = get_sidebar(filters)
+    if page.has_next:
+        data['next_url'] = page_url(request, page.next_cursor)
 
-    print('you are : ', request.session.get('email'))
     return render(request, 'index.html', data)
 
 
@@ -1,25 +1,50 @@
+import logging
+
+from asgiref.sync import sync_to_async
 from django.shortcuts import render , redirect , HttpResponseRedirect
-from django.contrib.auth.hashers import  check_password
 from store.models.customer import Customer
-from django.views import View
+from store.cart import get_cart_store
+from store.passwords import check_password_async, HashingBusy
+from store.ratelimit import login_by_ip, login_by_email, client_ip, login_key
+from store.views.asyncview import AsyncView
+
+logger = logging.getLogger(__name__)
+
+
+def _render(request, data=None, status=200):
+    return render (request, 'login.html', data, status=status)
 
 
-class Login(View):
+def _log_in(request, customer):
+    request.session['customer'] = customer.id
+
+
+class Login(AsyncView):
     return_url = None
 
-    def get(self, request):
+    async def get(self, request):
         Login.return_url = request.GET.get ('return_url')
-        return render (request, 'login.html')
+        return await sync_to_async (_render) (request)
 
-    def post(self, request):
-        email = request.POST.get ('email')
+    async def post(self, request):
+        email = Customer.normalize_email (request.POST.get ('email'))
         password = request.POST.get ('password')
-        customer = Customer.get_customer_by_email (email)
+
+        # floods are turned away before any database work or hashing
+        if not login_by_ip.consume (client_ip (request)) or not login_by_email.consume (login_key (email, request)):
+            return await sync_to_async (_render) (
+                request, {'error': 'Too many attempts, please try again later'}, status=429)
+
+        customer = await sync_to_async (Customer.get_customer_by_email) (email)
         error_message = None
         if customer:
-            flag = check_password (password, customer.password)
+            try:
+                flag = await check_password_async (password, customer.password)
+            except HashingBusy:
+                return await sync_to_async (_render) (
+                    request, {'error': 'Server is busy, please try again'}, status=503)
             if flag:
-                request.session['customer'] = customer.id
+                await sync_to_async (_log_in) (request, customer)
 
                 if Login.return_url:
                     return HttpResponseRedirect (Login.return_url)
@@ -31,9 +56,10 @@ class Login(View):
         else:
             error_message = 'Invalid !!'
 
-        print (email, password)
-        return render (request, 'login.html', {'error': error_message})
+        logger.info ('failed login for %s', email)
+        return await sync_to_async (_render) (request, {'error': error_message})
 
 def logout(request):
     request.session.clear()
+    get_cart_store(request).clear()
     return redirect('login')
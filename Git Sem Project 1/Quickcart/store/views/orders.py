@@ -1,16 +1,41 @@
+import datetime
+import logging
+
 from django.shortcuts import render, redirect
-from django.contrib.auth.hashers import check_password
-from store.models.customer import Customer
+from django.http import HttpResponseBadRequest
+from django.contrib.admin.views.decorators import staff_member_required
 from django.views import View
-from store.models.product import Products
 from store.models.orders import Order
-from store.middlewares.auth import auth_middleware
+from store.pagination import page_url
+from store.exports import stream_orders_csv
+
+logger = logging.getLogger(__name__)
 
 class OrderView(View):
 
 
     def get(self , request ):
         customer = request.session.get('customer')
-        orders = Order.get_orders_by_customer(customer)
-        print(orders)
-        return render(request , 'orders.html'  , {'orders' : orders})
+        orders = Order.get_orders_page(customer, request.GET.get('after'))
+        logger.debug('customer %s order page of %s', customer, len(orders))
+        data = {'orders' : orders}
+        if orders.has_next:
+            data['next_url'] = page_url(request, orders.next_cursor)
+        return render(request , 'orders.html'  , data)
+
+
+@staff_member_required
+def export_orders(request):
+    # /orders/export?start=2024-01-01&end=2024-12-31 (both optional, inclusive)
+    orders = Order.objects.all()
+    try:
+        start = request.GET.get('start')
+        end = request.GET.get('end')
+        if start:
+            orders = orders.filter(date__gte=datetime.date.fromisoformat(start))
+        if end:
+            orders = orders.filter(date__lte=datetime.date.fromisoformat(end))
+    except ValueError:
+        return HttpResponseBadRequest('start and end must be YYYY-MM-DD dates')
+    filename = f"orders-{start or 'all'}-{end or 'now'}.csv"
+    return stream_orders_csv(orders, filename)
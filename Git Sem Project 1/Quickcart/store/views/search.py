@@ -0,0 +1,29 @@
+from django.shortcuts import render
+from django.http import JsonResponse
+from django.views import View
+
+from store.models.category import Category
+from store.search import SEARCH_LIMIT, search_products, suggest_product_names
+
+
+class Search(View):
+
+    def get(self, request):
+        query = request.GET.get('q', '').strip()
+        categoryID = request.GET.get('category')
+        if not (categoryID or '').isdigit():
+            categoryID = None
+
+        data = {}
+        data['query'] = query
+        data['category_id'] = int(categoryID) if categoryID else None
+        data['categories'] = Category.get_all_categories()
+        data['products'] = search_products(query, categoryID) if query else []
+        # results stop at the SEARCH_LIMIT best matches; there are no further pages
+        data['limited'] = len(data['products']) >= SEARCH_LIMIT
+        return render(request, 'search.html', data)
+
+
+def suggest(request):
+    query = request.GET.get('q', '').strip()
+    return JsonResponse({'suggestions': suggest_product_names(query) if query else []})
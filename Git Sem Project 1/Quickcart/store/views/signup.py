@@ -1,19 +1,26 @@
+import logging
+
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect
-from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError
 from store.models.customer import Customer
-from django.views import View
+from store.passwords import make_password_async, HashingBusy
+from store.ratelimit import signup_by_ip, client_ip
+from store.views.asyncview import AsyncView
+
+logger = logging.getLogger(__name__)
 
 
-class Signup (View):
-    def get(self, request):
-        return render (request, 'signup.html')
+class Signup (AsyncView):
+    async def get(self, request):
+        return await sync_to_async (render) (request, 'signup.html')
 
-    def post(self, request):
+    async def post(self, request):
         postData = request.POST
         first_name = postData.get ('firstname')
         last_name = postData.get ('lastname')
         phone = postData.get ('phone')
-        email = postData.get ('email')
+        email = Customer.normalize_email (postData.get ('email'))
         password = postData.get ('password')
         # validation
         value = {
@@ -29,19 +36,28 @@ class Signup (View):
                              phone=phone,
                              email=email,
                              password=password)
-        error_message = self.validateCustomer (customer)
+        if not signup_by_ip.consume (client_ip (request)):
+            error_message = 'Too many sign ups, please try again later'
+        else:
+            error_message = await sync_to_async (self.validateCustomer) (customer)
 
         if not error_message:
-            print (first_name, last_name, phone, email, password)
-            customer.password = make_password (customer.password)
-            customer.register ()
-            return redirect ('homepage')
-        else:
-            data = {
-                'error': error_message,
-                'values': value
-            }
-            return render (request, 'signup.html', data)
+            logger.debug ('signing up %s', email)
+            try:
+                customer.password = await make_password_async (customer.password)
+                await sync_to_async (customer.register) ()
+                return redirect ('homepage')
+            except HashingBusy:
+                error_message = 'Server is busy, please try again'
+            except IntegrityError:
+                # lost a race with another sign up for the same address
+                error_message = 'Email Address Already Registered..'
+
+        data = {
+            'error': error_message,
+            'values': value
+        }
+        return await sync_to_async (render) (request, 'signup.html', data)
 
     def validateCustomer(self, customer):
         error_message = None
@@ -57,7 +73,7 @@ class Signup (View):
             error_message = 'Enter your Phone Number'
         elif len (customer.phone) < 10:
             error_message = 'Phone Number must be 10 char Long'
-        elif len (customer.password) < 5:
+        elif len (customer.password or '') < 5:
             error_message = 'Password must be 5 char long'
         elif len (customer.email) < 5:
             error_message = 'Email must be 5 char long'